@@ -1,30 +1,55 @@
 """Command-line interface for the filing cabinet."""
 import click
+import functools
+import itertools
+import json
 import os
-from .services.file_service import FileService
-from .config import get_config
+from typing import TYPE_CHECKING, Any, Optional, Tuple
+from .config import ConfigService, get_config
 from .cli_utils import (
     echo_error, echo_warning, echo_success, 
     echo_info, echo_header, format_error, 
-    format_file_info, confirm_action, progress_spinner
+    format_header, format_file_info, confirm_action, progress_spinner
 )
 
+if TYPE_CHECKING:
+    from .services.file_service import FileService
+
 DB_PATH = os.path.expanduser('~/filing.cabinet')
-file_service = None
-config_service = None
 
-def init_services():
-    """Initialize services."""
-    global file_service, config_service
-    if file_service is None:
-        config_service = get_config(DB_PATH)
-        file_service = FileService(DB_PATH)
-    return file_service, config_service
+@functools.lru_cache(maxsize=1)
+def init_config() -> ConfigService:
+    """Initialize the configuration service once per process."""
+    return get_config(DB_PATH)
+
+@functools.lru_cache(maxsize=1)
+def init_services() -> Tuple['FileService', ConfigService]:
+    """Initialize services once per process."""
+    # Deferred so config commands can start without loading the file pipeline
+    from .services.file_service import FileService
+    return FileService(DB_PATH), init_config()
+
+def close_services() -> None:
+    """Close the services this command opened, if any."""
+    if init_services.cache_info().currsize:
+        service, _ = init_services()
+        service.close()
+        init_services.cache_clear()
+
+def parse_value(value: Optional[str]) -> Any:
+    """Read a command-line value given with --json as JSON (numbers, booleans, lists)."""
+    if value is None:
+        return None
+    try:
+        return json.loads(value)
+    except json.JSONDecodeError as e:
+        raise click.BadParameter(f"{value!r} is not valid JSON: {e}")
 
 @click.group()
-def cli():
+@click.pass_context
+def cli(ctx):
     """Filing cabinet CLI."""
-    pass
+    ctx.call_on_close(close_services)
 
 @cli.group()
 def config():
@@ -37,7 +62,7 @@ def config():
 def config_get(key, default):
     """Get a configuration value."""
     try:
-        _, config = init_services()
+        config = init_config()
         value = config.get(key, default)
         echo_info(f"{key}: {value}")
     except Exception as e:
@@ -47,11 +72,12 @@ def config_get(key, default):
 @config.command(name="set")
 @click.argument('key')
 @click.argument('value')
-def config_set(key, value):
+@click.option('--json', 'as_json', is_flag=True, help="Parse the value as JSON rather than storing text")
+def config_set(key, value, as_json):
     """Set a configuration value."""
     try:
-        _, config = init_services()
-        config.set(key, value)
+        config = init_config()
+        config.set(key, parse_value(value) if as_json else value)
         echo_success(f"Set {key} to {value}")
     except Exception as e:
         echo_error(format_error(e))
@@ -62,21 +88,26 @@ def config_set(key, value):
 @click.argument('value')
 @click.option('--default', help="Default value for the key")
 @click.option('--description', help="Description of the configuration")
-def config_create(key, value, default, description):
+@click.option('--json', 'as_json', is_flag=True, help="Parse the value and default as JSON rather than storing text")
+def config_create(key, value, default, description, as_json):
     """Create a new configuration entry."""
     try:
-        _, config = init_services()
-        config.create(key, value, default, description or '')
+        config = init_config()
+        if as_json:
+            config.create(key, parse_value(value), parse_value(default), description or '')
+        else:
+            config.create(key, value, default, description or '')
         echo_success(f"Created {key} with value {value}")
     except Exception as e:
         echo_error(format_error(e))
         exit(1)
 
 @config.command(name="list")
-def config_list():
+@click.option('--json', 'as_json', is_flag=True, help="Print the configuration as JSON")
+def config_list(as_json):
     """List all configuration values."""
     try:
-        _, config = init_services()
+        config = init_config()
         configs = config.list_all()
         
         # Mask sensitive values
@@ -85,14 +116,25 @@ def config_list():
             if key:
                 configs['openai.api_key']['value'] = f"{key[:8]}...{key[-4:]}"
         
-        for key, value in configs.items():
-            echo_info(f"{key}:")
-            echo_info(f"  Value: {value['value']}")
-            if value['default']:
-                echo_info(f"  Default: {value['default']}")
-            if value['description']:
-                echo_info(f"  Description: {value['description']}")
-            echo_info()
+        if as_json:
+            click.echo(json.dumps(configs, indent=2, sort_keys=True, default=str))
+            return
+        
+        # list_all is ordered by key, so each prefix is one contiguous run.
+        # Output is collected and written with a single echo.
+        lines = []
+        groups = itertools.groupby(configs.items(), key=lambda item: item[0].partition('.')[0])
+        for prefix, entries in groups:
+            lines.append(format_header(prefix))
+            for key, value in entries:
+                lines.append(f"{key}:")
+                lines.append(f"  Value: {value['value']}")
+                if value['default']:
+                    lines.append(f"  Default: {value['default']}")
+                if value['description']:
+                    lines.append(f"  Description: {value['description']}")
+                lines.append("")
+        echo_info("\n".join(lines))
     except Exception as e:
         echo_error(format_error(e))
         exit(1)
@@ -102,7 +144,7 @@ def config_list():
 def config_reset(key):
     """Reset configuration value to default."""
     try:
-        _, config = init_services()
+        config = init_config()
         config.reset(key)
         echo_success(f"Reset {key} to default value")
     except Exception as e:
@@ -114,7 +156,7 @@ def config_reset(key):
 def config_export(file_path):
     """Export configuration to a file."""
     try:
-        _, config = init_services()
+        config = init_config()
         config.export_to_file(file_path)
         echo_success(f"Configuration exported to {file_path}")
     except Exception as e:
@@ -126,7 +168,7 @@ def config_export(file_path):
 def config_import(file_path):
     """Import configuration from a file."""
     try:
-        _, config = init_services()
+        config = init_config()
         config.import_from_file(file_path)
         echo_success(f"Configuration imported from {file_path}")
     except Exception as e:
@@ -138,21 +180,17 @@ def config_import(file_path):
 def config_set_openai_key(api_key):
     """Securely set the OpenAI API key in the configuration."""
     try:
-        _, config = init_services()
+        config = init_config()
         
         # Validate API key format (basic check)
         if not api_key.startswith(('sk-', 'org-')):
             echo_error("Error: Invalid OpenAI API key format. Key should start with 'sk-' or 'org-'")
             exit(1)
             
-        try:
-            # Try to get existing key first
-            config.get('openai.api_key')
-            # If key exists, update it
+        if config.has('openai.api_key'):
             config.set('openai.api_key', api_key)
             echo_success("OpenAI API key has been updated.")
-        except Exception:
-            # If key doesn't exist, create it
+        else:
             config.create('openai.api_key', api_key, description='OpenAI API key for AI-powered document processing')
             echo_success("OpenAI API key has been securely stored in the configuration.")
         
@@ -180,12 +218,14 @@ def status():
 
 @cli.command()
 @click.argument('path', type=click.Path(exists=True), default=os.path.expanduser('~'))
-def index(path):
+@click.option('--workers', type=click.IntRange(min=1),
+              help="Threads used to checksum files (default: indexing.workers)")
+def index(path, workers):
     """Index files in the given path."""
     try:
         service, _ = init_services()
         with progress_spinner("Indexing files"):
-            result = service.index_files(path)
+            result = service.index_files(path, workers=workers)
         if not result['processed']:
             echo_info("No new files found to index.")
         else:
@@ -198,12 +238,13 @@ def index(path):
 
 @cli.command()
 @click.argument('path', type=click.Path(exists=True))
-def process(path):
+@click.option('--sidecar', is_flag=True, help="Also write metadata to <file>.filing_meta_data")
+def process(path, sidecar):
     """Process a file to extract metadata and content."""
     try:
         service, _ = init_services()
         with progress_spinner("Processing file"):
-            service.process_file(path, extract_content=True)
+            service.process_file(path, extract_content=True, sidecar=sidecar)
         echo_success("File processed successfully")
     except Exception as e:
         echo_error(format_error(e))
@@ -255,12 +296,14 @@ def analyze(path):
 
 @cli.command()
 @click.argument('path', type=click.Path(exists=True))
-def add(path):
+@click.option('--workers', type=click.IntRange(min=1),
+              help="Files processed in parallel (default: file.process.workers)")
+def add(path, workers):
     """Add a file or directory to the filing cabinet."""
     try:
         service, _ = init_services()
         with progress_spinner("Processing files"):
-            result = service.add_file(path)
+            result = service.add_file(path, workers=workers)
         echo_success(f"Successfully processed {result['processed']} files")
         if result.get('skipped', 0) > 0:
             echo_warning(f"Skipped {result['skipped']} files")
@@ -281,9 +324,9 @@ def search(query):
             return
             
         echo_header(f"Search Results for '{query}'")
-        for result in results:
-            echo_info("\nFile:")
-            echo_info(format_file_info(result))
+        echo_info("\n".join(
+            f"\nFile:\n{format_file_info(result)}" for result in results
+        ))
             
     except Exception as e:
         echo_error(format_error(e))
@@ -291,7 +334,8 @@ def search(query):
 
 @cli.command()
 @click.argument('file_id')
-def info(file_id):
+@click.option('--json', 'as_json', is_flag=True, help="Print the file information as JSON")
+def info(file_id, as_json):
     """Get detailed information about a file."""
     try:
         service, _ = init_services()
@@ -300,6 +344,10 @@ def info(file_id):
         if not file_info:
             echo_error(f"No file found with ID: {file_id}")
             return
+        
+        if as_json:
+            click.echo(json.dumps(file_info, indent=2, default=str))
+            return
             
         echo_header("File Information")
         echo_info(format_file_info(file_info))
@@ -1,7 +1,6 @@
 """CLI utilities for the filing cabinet."""
 import click
 import sys
-import time
 import threading
 from typing import Any, Dict
 from contextlib import contextmanager
@@ -35,8 +34,14 @@ def echo_info(message: str = "") -> None:
 
 def echo_header(message: str) -> None:
     """Print a header message in cyan."""
-    click.secho(message, fg=Style.HEADER)
-    click.secho("-" * len(message), fg=Style.HEADER)
+    click.echo(format_header(message))
+
+def format_header(message: str) -> str:
+    """Format a header message, underlined, in cyan."""
+    return "\n".join((
+        click.style(message, fg=Style.HEADER),
+        click.style("-" * len(message), fg=Style.HEADER)
+    ))
 
 def format_error(error: Exception) -> str:
     """Format an error message."""
@@ -56,18 +61,26 @@ def format_file_info(metadata: Dict[str, Any]) -> str:
 
 @contextmanager
 def progress_spinner(message: str = "Processing"):
-    """Display a spinner while processing."""
-    spinner_chars = "⠋⠙⠹⠸⠼⠴⠦⠧⠇⠏"
-    stop_spinner = False
+    """Display a spinner while processing.
+    
+    Nothing is drawn (and no thread started) when stdout is not a terminal.
+    """
+    if not sys.stdout.isatty():
+        yield
+        return
+    
+    frames = [f"\r{message} {char} " for char in "⠋⠙⠹⠸⠼⠴⠦⠧⠇⠏"]
+    clear = "\r" + " " * (len(message) + 2) + "\r"
+    stop_spinner = threading.Event()
     
     def spin():
         i = 0
-        while not stop_spinner:
-            sys.stdout.write(f"\r{message} {spinner_chars[i]} ")
+        # Event.wait doubles as the tick and returns as soon as we're stopped
+        while not stop_spinner.wait(0.1):
+            sys.stdout.write(frames[i])
             sys.stdout.flush()
-            i = (i + 1) % len(spinner_chars)
-            time.sleep(0.1)
-        sys.stdout.write("\r" + " " * (len(message) + 2) + "\r")
+            i = (i + 1) % len(frames)
+        sys.stdout.write(clear)
         sys.stdout.flush()
     
     spinner_thread = threading.Thread(target=spin)
@@ -77,7 +90,7 @@ def progress_spinner(message: str = "Processing"):
     try:
         yield
     finally:
-        stop_spinner = True
+        stop_spinner.set()
         spinner_thread.join()
 
 def confirm_action(message: str = "Are you sure?") -> bool:
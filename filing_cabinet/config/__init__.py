@@ -3,6 +3,8 @@ from typing import Optional
 from .config_service import ConfigService
 from .configuration import ConfigurationError
 
+_DEFAULT_DB_PATH = os.path.expanduser('~/filing.cabinet')
+
 def get_config(db_path: Optional[str] = None) -> ConfigService:
     """
     Get the configuration service instance.
@@ -13,7 +15,5 @@ def get_config(db_path: Optional[str] = None) -> ConfigService:
     Returns:
         ConfigService instance
     """
-    if db_path is None:
-        db_path = os.path.expanduser('~/filing.cabinet')
-    
-    return ConfigService(db_path)
+    # ConfigService hands back its open instance for the same path
+    return ConfigService(db_path or _DEFAULT_DB_PATH)
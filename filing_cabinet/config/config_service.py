@@ -2,32 +2,53 @@ from typing import Any, Dict, Optional
 from .configuration import Configuration, ConfigurationError
 from ..utils import logger
 
-class ConfigService:
+# Immutable defaults shared by every reference to DEFAULT_CONFIG
+DEFAULT_INDEX_EXTENSIONS = ('.txt', '.pdf', '.doc', '.docx')
+DEFAULT_IGNORE_PATTERNS = ('.git/*', '*.pyc', '__pycache__/*')
+
+class _SingletonMeta(type):
+    """Metaclass returning one shared instance per class and database path.
+    
+    An instance is only rebuilt once it was closed; otherwise construction
+    is a lookup. Instances for other paths are left to whoever holds them.
+    """
+    
+    def __call__(cls, db_path: str) -> Any:
+        instances = cls.__dict__.get('_instances')
+        if instances is None:
+            instances = cls._instances = {}
+        instance = instances.get(db_path)
+        if instance is None or not instance.is_initialized:
+            instance = instances[db_path] = super().__call__(db_path)
+        return instance
+
+class ConfigService(metaclass=_SingletonMeta):
     """Service for managing application configuration."""
     
     # Default configuration values
     DEFAULT_CONFIG = {
         'cabinet.name': ('Filing Cabinet', 'Name of the filing cabinet'),
         'database.schema.version': ('1.0.0', 'Database schema version'),
-        'file.index.extensions': (['.txt', '.pdf', '.doc', '.docx'], 'List of file extensions to index'),
+        'file.index.extensions': (DEFAULT_INDEX_EXTENSIONS, 'List of file extensions to index'),
+        'file.hash.algorithm': ('sha256', 'Checksum algorithm for files (sha256, or blake3 if installed)'),
+        'file.process.workers': (0, 'Number of files (or PDF pages) processed in parallel, 0 for automatic'),
         'file.checkin.max_size': (100 * 1024 * 1024, 'Maximum file size in bytes (100MB)'),
         'storage.compression': ('none', 'Storage compression method'),
         'storage.encryption': ('none', 'Storage encryption method'),
         'indexing.recursive': (True, 'Whether to recursively index subdirectories'),
         'indexing.follow_symlinks': (False, 'Whether to follow symbolic links during indexing'),
-        'indexing.ignore_patterns': (['.git/*', '*.pyc', '__pycache__/*'], 'Patterns to ignore during indexing')
+        'indexing.workers': (8, 'Number of threads hashing files during indexing (1 for spinning disks)'),
+        'indexing.ignore_patterns': (DEFAULT_IGNORE_PATTERNS, 'Patterns to ignore during indexing')
     }
     
-    _instance = None
+    # Open instances by database path, kept by _SingletonMeta
+    _instances: Dict[str, 'ConfigService'] = {}
     
-    def __new__(cls, db_path: str):
-        """Create or return singleton instance."""
-        if cls._instance is None:
-            cls._instance = super().__new__(cls)
-            cls._instance._config = None
-            cls._instance._db_path = db_path
-            cls._instance._initialize()
-        return cls._instance
+    def __init__(self, db_path: str):
+        """Open the configuration database at db_path."""
+        self._config = None
+        self._db_path = db_path
+        self._initialize()
     
     def _initialize(self) -> None:
         """Initialize configuration."""
@@ -41,12 +62,7 @@ class ConfigService:
     def _ensure_defaults(self) -> None:
         """Ensure default configuration values exist."""
         try:
-            for key, (value, description) in self.DEFAULT_CONFIG.items():
-                try:
-                    self._config.get_config(key)
-                except ConfigurationError:
-                    self._config.create_config(key, value, value, description)
-                    logger.debug(f"Created default configuration: {key} = {value}")
+            self._config.create_missing_configs(self.DEFAULT_CONFIG)
         except Exception as e:
             logger.error(f"Failed to ensure default configuration: {e}")
             raise ConfigurationError(f"Failed to ensure default configuration: {e}")
@@ -61,6 +77,12 @@ class ConfigService:
             logger.error(f"Failed to get configuration {key}: {e}")
             raise ConfigurationError(f"Failed to get configuration: {e}")
     
+    def has(self, key: str) -> bool:
+        """Check whether a configuration key exists."""
+        if self._config is None:
+            raise ConfigurationError("Configuration not initialized")
+        return self._config.has_config(key)
+    
     def set(self, key: str, value: Any) -> None:
         """Set configuration value."""
         if self._config is None:
@@ -95,7 +117,7 @@ class ConfigService:
             raise ConfigurationError(f"Failed to reset configuration: {e}")
     
     def list_all(self) -> Dict[str, Dict[str, Any]]:
-        """List all configuration values."""
+        """List all configuration values, ordered by key."""
         if self._config is None:
             raise ConfigurationError("Configuration not initialized")
         try:
@@ -132,6 +154,11 @@ class ConfigService:
             self._config.close()
             self._config = None
             
+    @property
+    def db_path(self) -> str:
+        """Path of the configuration database."""
+        return self._db_path
+    
     @property
     def is_initialized(self) -> bool:
         """Check if the configuration service is initialized."""
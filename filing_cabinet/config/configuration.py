@@ -1,7 +1,30 @@
 """Configuration management for Filing Cabinet."""
 import json
 import sqlite3
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple
+
+# Statements are kept constant so sqlite's statement cache reuses their
+# prepared plans across calls
+LOAD_SQL = "SELECT key, value, is_json FROM config"
+GET_SQL = "SELECT value, is_json FROM config WHERE key = ?"
+HAS_SQL = "SELECT 1 FROM config WHERE key = ? LIMIT 1"
+PUT_SQL = "UPDATE config SET value = ?, is_json = ? WHERE key = ?"
+CREATE_SQL = """
+    INSERT INTO config (key, value, is_json, default_value, default_is_json, description)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+CREATE_MISSING_SQL = """
+    INSERT OR IGNORE INTO config (key, value, is_json, default_value, default_is_json, description)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+RESET_SQL = """
+    UPDATE config SET value = default_value, is_json = default_is_json
+    WHERE key = ? AND default_value IS NOT NULL
+"""
+LIST_SQL = """
+    SELECT key, value, is_json, default_value, default_is_json, description
+    FROM config ORDER BY key
+"""
 
 class ConfigurationError(Exception):
     """Configuration-related errors."""
@@ -15,13 +38,24 @@ class Configuration:
         self.db_path = db_path
         self.conn = None
         self.cursor = None
+        # Decoded values by key; the table is small enough to hold whole
+        self._cache: Dict[str, Any] = {}
+        # Connects once; the other methods use the open connection as-is
         self._create_tables()
+        self._load_cache()
     
     def _connect(self) -> None:
         """Connect to the database."""
         if self.conn is None:
-            self.conn = sqlite3.connect(self.db_path)
+            # Reads may come from FileService worker threads; sqlite itself
+            # serializes access to the connection
+            self.conn = sqlite3.connect(self.db_path, check_same_thread=False, cached_statements=256)
             self.cursor = self.conn.cursor()
+            # Same settings as the repositories sharing this database file,
+            # so config commits don't fsync the main database every time
+            self.conn.execute('PRAGMA journal_mode=WAL')
+            self.conn.execute('PRAGMA synchronous=NORMAL')
+            self.conn.execute('PRAGMA temp_store=MEMORY')
     
     def _create_tables(self) -> None:
         """Create configuration tables."""
@@ -31,14 +65,47 @@ class Configuration:
             CREATE TABLE IF NOT EXISTS config (
                 key TEXT PRIMARY KEY,
                 value TEXT NOT NULL,
+                is_json INTEGER NOT NULL DEFAULT 0,
                 default_value TEXT,
+                default_is_json INTEGER NOT NULL DEFAULT 0,
                 description TEXT
             )
             ''')
+            
+            # Tables created before values were tagged: every value used to
+            # be tried as JSON, so tag whatever parses as JSON
+            columns = {row[1] for row in self.conn.execute('PRAGMA table_info(config)')}
+            if 'is_json' not in columns:
+                self.cursor.execute('ALTER TABLE config ADD COLUMN is_json INTEGER NOT NULL DEFAULT 0')
+                self.cursor.execute('ALTER TABLE config ADD COLUMN default_is_json INTEGER NOT NULL DEFAULT 0')
+                self.cursor.execute('''
+                UPDATE config SET is_json = json_valid(value),
+                                  default_is_json = coalesce(json_valid(default_value), 0)
+                ''')
             self.conn.commit()
         except sqlite3.Error as e:
             raise ConfigurationError(f"Failed to create tables: {str(e)}")
     
+    @staticmethod
+    def _encode(value: Any) -> Tuple[str, int]:
+        """Return the stored text for a value and whether it is JSON."""
+        if isinstance(value, str):
+            return value, 0
+        return json.dumps(value), 1
+    
+    @staticmethod
+    def _decode(value: Optional[str], is_json: int) -> Any:
+        """Turn stored text back into its value."""
+        return json.loads(value) if is_json else value
+    
+    def _load_cache(self) -> None:
+        """Fill the value cache from a single query over the config table."""
+        try:
+            rows = self.conn.execute(LOAD_SQL).fetchall()
+        except sqlite3.Error as e:
+            raise ConfigurationError(f"Database error: {str(e)}")
+        self._cache = {key: self._decode(value, is_json) for key, value, is_json in rows}
+    
     def get_config(self, key: str, default: Any = None) -> Any:
         """
         Get configuration value for the given key.
@@ -50,22 +117,29 @@ class Configuration:
         Returns:
             Configuration value
         """
+        if key in self._cache:
+            return self._cache[key]
         try:
-            self._connect()
-            self.cursor.execute('SELECT value FROM config WHERE key = ?', (key,))
-            row = self.cursor.fetchone()
+            # Use a private cursor so concurrent readers don't share results
+            row = self.conn.execute(GET_SQL, (key,)).fetchone()
             
             if row is None:
                 if default is not None:
                     return default
                 raise ConfigurationError(f"Configuration key '{key}' not found")
             
-            # Try to parse as JSON, fallback to string if not valid JSON
-            try:
-                return json.loads(row[0])
-            except json.JSONDecodeError:
-                return row[0]
-                
+            value = self._cache[key] = self._decode(*row)
+            return value
+        
+        except sqlite3.Error as e:
+            raise ConfigurationError(f"Database error: {str(e)}")
+    
+    def has_config(self, key: str) -> bool:
+        """Check whether a configuration key exists."""
+        if key in self._cache:
+            return True
+        try:
+            return self.conn.execute(HAS_SQL, (key,)).fetchone() is not None
         except sqlite3.Error as e:
             raise ConfigurationError(f"Database error: {str(e)}")
     
@@ -78,17 +152,14 @@ class Configuration:
             value: Value to set
         """
         try:
-            self._connect()
-            # Convert value to JSON string if it's not a string
-            if not isinstance(value, str):
-                value = json.dumps(value)
+            # Strings are stored as-is, anything else as JSON
+            value, is_json = self._encode(value)
                 
-            self.cursor.execute('''
-            UPDATE config SET value = ? WHERE key = ?
-            ''', (value, key))
+            cursor = self.conn.execute(PUT_SQL, (value, is_json, key))
             self.conn.commit()
             
-            if self.cursor.rowcount == 0:
+            self._cache.pop(key, None)
+            if cursor.rowcount == 0:
                 raise ConfigurationError(f"Configuration key '{key}' not found")
                 
         except sqlite3.Error as e:
@@ -105,24 +176,50 @@ class Configuration:
             description: Description of the configuration
         """
         try:
-            self._connect()
-            # Convert values to JSON strings if they're not strings
-            if not isinstance(value, str):
-                value = json.dumps(value)
-            if default is not None and not isinstance(default, str):
-                default = json.dumps(default)
+            # Strings are stored as-is, anything else as JSON
+            value, is_json = self._encode(value)
+            default, default_is_json = self._encode(default) if default is not None else (None, 0)
                 
-            self.cursor.execute('''
-            INSERT INTO config (key, value, default_value, description)
-            VALUES (?, ?, ?, ?)
-            ''', (key, value, default, description))
+            self.conn.execute(CREATE_SQL, (key, value, is_json, default, default_is_json, description))
             self.conn.commit()
+            self._cache[key] = self._decode(value, is_json)
             
         except sqlite3.IntegrityError:
             raise ConfigurationError(f"Configuration key '{key}' already exists")
         except sqlite3.Error as e:
             raise ConfigurationError(f"Database error: {str(e)}")
     
+    def create_missing_configs(self, entries: Dict[str, Tuple[Any, str]]) -> None:
+        """
+        Create configuration entries whose keys don't exist yet.
+        
+        Keys already present in the value cache (which holds every stored
+        key) are skipped up front, so an existing database is not written
+        at all; the rest go out in one statement and one commit.
+        
+        Args:
+            entries: Mapping of key to (value, description); the value is
+                also stored as the default
+        """
+        try:
+            rows = []
+            for key, (value, description) in entries.items():
+                if key in self._cache:
+                    continue
+                value, is_json = self._encode(value)
+                rows.append((key, value, is_json, value, is_json, description))
+            if not rows:
+                return
+                
+            self.conn.executemany(CREATE_MISSING_SQL, rows)
+            self.conn.commit()
+            for key, value, is_json, *_ in rows:
+                # Keys that already existed kept their stored value
+                self._cache.setdefault(key, self._decode(value, is_json))
+            
+        except sqlite3.Error as e:
+            raise ConfigurationError(f"Database error: {str(e)}")
+    
     def reset_config(self, key: str) -> None:
         """
         Reset configuration to default value.
@@ -131,14 +228,11 @@ class Configuration:
             key: Configuration key
         """
         try:
-            self._connect()
-            self.cursor.execute('''
-            UPDATE config SET value = default_value
-            WHERE key = ? AND default_value IS NOT NULL
-            ''', (key,))
+            cursor = self.conn.execute(RESET_SQL, (key,))
             self.conn.commit()
             
-            if self.cursor.rowcount == 0:
+            self._cache.pop(key, None)
+            if cursor.rowcount == 0:
                 raise ConfigurationError(f"Configuration key '{key}' not found or has no default value")
                 
         except sqlite3.Error as e:
@@ -149,27 +243,22 @@ class Configuration:
         List all configuration entries.
         
         Returns:
-            Dictionary of configuration entries
+            Dictionary of configuration entries, ordered by key
         """
         try:
-            self._connect()
-            self.cursor.execute('SELECT key, value, default_value, description FROM config')
-            rows = self.cursor.fetchall()
+            rows = self.conn.execute(LIST_SQL).fetchall()
             
             config_dict = {}
-            for key, value, default, description in rows:
-                try:
-                    config_dict[key] = {
-                        'value': json.loads(value),
-                        'default': json.loads(default) if default else None,
-                        'description': description
-                    }
-                except json.JSONDecodeError:
-                    config_dict[key] = {
-                        'value': value,
-                        'default': default,
-                        'description': description
-                    }
+            for key, value, is_json, default, default_is_json, description in rows:
+                decoded = self._decode(value, is_json)
+                config_dict[key] = {
+                    'value': decoded,
+                    # Most entries still hold their default, so skip decoding
+                    # the same text twice
+                    'default': decoded if (default, default_is_json) == (value, is_json)
+                               else self._decode(default, default_is_json),
+                    'description': description
+                }
             
             return config_dict
             
@@ -217,3 +306,4 @@ class Configuration:
             self.conn.close()
             self.conn = None
             self.cursor = None
+            self._cache.clear()
@@ -1,31 +1,47 @@
 """File model for the filing cabinet."""
 import os
-import hashlib
-from typing import Dict, Any
+from typing import Dict, Any, Mapping, Optional
+from ..utils.file_utils import calculate_checksum, get_mime_type
 
 class File:
     """Represents a file in the filing cabinet."""
 
-    def __init__(self, file_path: str):
-        """Initialize a file from a path."""
+    def __init__(self, file_path: str, hash_algorithm: str = 'sha256',
+                 checksum: Optional[str] = None,
+                 stat_result: Optional[os.stat_result] = None):
+        """Initialize a file from a path, hashing it with ``hash_algorithm``.
+        
+        A ``checksum`` already known for the file's current contents is
+        used as-is instead of reading the file, and a ``stat_result`` the
+        caller already has saves another stat call.
+        """
+        self.hash_algorithm = hash_algorithm
         self.path = os.path.abspath(file_path)
-        self.name = os.path.basename(file_path)
-        self.size = os.path.getsize(file_path)
-        self.checksum = self._calculate_checksum()
+        self.name = os.path.basename(self.path)
+        if stat_result is None:
+            stat_result = os.stat(self.path)
+        self.size = stat_result.st_size
+        self.checksum = checksum or self._calculate_checksum()
         self.mime_type = self._get_mime_type()
 
+    @classmethod
+    def from_record(cls, record: Mapping[str, Any]) -> 'File':
+        """Rebuild a file from a stored database row without reading it from disk."""
+        file = cls.__new__(cls)
+        file.path = record['path']
+        file.name = record['name']
+        file.size = record['size']
+        file.checksum = record['checksum']
+        file.mime_type = record['mime_type']
+        return file
+
     def _calculate_checksum(self) -> str:
-        """Calculate SHA-256 checksum of the file."""
-        sha256_hash = hashlib.sha256()
-        with open(self.path, "rb") as f:
-            for byte_block in iter(lambda: f.read(4096), b""):
-                sha256_hash.update(byte_block)
-        return sha256_hash.hexdigest()
+        """Calculate the checksum of the file."""
+        return calculate_checksum(self.path, self.hash_algorithm)
 
     def _get_mime_type(self) -> str:
         """Get the MIME type of the file."""
-        import magic
-        return magic.from_file(self.path, mime=True)
+        return get_mime_type(self.path)
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert file to dictionary representation."""
@@ -1,5 +1,6 @@
 """Repositories package for Filing Cabinet."""
 from .base import BaseRepository
 from .file_repository import FileRepository
+from .ocr_cache_repository import OcrCacheRepository
 
-__all__ = ['BaseRepository', 'FileRepository']
+__all__ = ['BaseRepository', 'FileRepository', 'OcrCacheRepository']
@@ -1,39 +1,106 @@
 """Base repository class for the filing cabinet."""
 import sqlite3
-from typing import List, Dict, Any, Optional
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Iterable, Iterator, List, Optional
 
-class BaseRepository:
-    """Base repository class with common database operations."""
+class BaseRepository(ABC):
+    """Base repository class with common database operations.
+
+    Subclasses define their tables in create_table.
+    """
 
     def __init__(self, db_path: str):
         """Initialize with database path."""
         self.db_path = db_path
         self.conn = None
         self.cursor = None
+        self._in_transaction = False
 
     def connect(self) -> None:
         """Connect to the database."""
-        self.conn = sqlite3.connect(self.db_path)
+        self.conn = sqlite3.connect(self.db_path, cached_statements=256)
         self.conn.row_factory = sqlite3.Row
+        # WAL + NORMAL only syncs at checkpoints instead of on every commit
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        # Keep temp b-trees in memory, allow a 64 MiB page cache and read
+        # through up to 256 MiB of memory-mapped database
+        self.conn.execute("PRAGMA temp_store=MEMORY")
+        self.conn.execute("PRAGMA cache_size=-65536")
+        self.conn.execute("PRAGMA mmap_size=268435456")
         self.cursor = self.conn.cursor()
 
     def close(self) -> None:
         """Close the database connection."""
         if self.conn:
             self.conn.close()
+            self.conn = None
+            self.cursor = None
+
+    def ensure_tables(self) -> None:
+        """Create the repository's tables, committing once for all of them."""
+        with self.transaction():
+            self.create_table()
+
+    @abstractmethod
+    def create_table(self) -> None:
+        """Create the repository's tables if they don't exist."""
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """Group all writes in the block into a single commit."""
+        if self._in_transaction:
+            yield
+            return
+        self._in_transaction = True
+        try:
+            yield
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        finally:
+            self._in_transaction = False
 
     def execute(self, query: str, params: tuple = ()) -> None:
-        """Execute a query and commit changes."""
+        """Execute a query and commit changes, unless inside a transaction."""
         self.cursor.execute(query, params)
-        self.conn.commit()
+        if not self._in_transaction:
+            self.conn.commit()
 
-    def fetch_one(self, query: str, params: tuple = ()) -> Optional[Dict[str, Any]]:
-        """Fetch a single row as a dictionary."""
+    def executemany(self, query: str, params_seq: Iterable[tuple]) -> None:
+        """Execute a query for each parameter tuple and commit, unless inside a transaction."""
+        self.cursor.executemany(query, params_seq)
+        if not self._in_transaction:
+            self.conn.commit()
+
+    # Rows come back as sqlite3.Row, which supports access by column name
+    # and index without copying each row into a dict
+
+    def fetch_one(self, query: str, params: tuple = ()) -> Optional[sqlite3.Row]:
+        """Fetch a single row."""
         self.cursor.execute(query, params)
-        row = self.cursor.fetchone()
-        return dict(row) if row else None
+        return self.cursor.fetchone()
 
-    def fetch_all(self, query: str, params: tuple = ()) -> List[Dict[str, Any]]:
-        """Fetch all rows as a list of dictionaries."""
+    def fetch_all(self, query: str, params: tuple = ()) -> List[sqlite3.Row]:
+        """Fetch all rows as a list."""
         self.cursor.execute(query, params)
-        return [dict(row) for row in self.cursor.fetchall()]
+        return self.cursor.fetchall()
+
+    def fetch_iter(self, query: str, params: tuple = (),
+                   batch_size: int = 1000) -> Iterator[sqlite3.Row]:
+        """Yield rows, fetching ``batch_size`` at a time.
+        
+        Runs on its own cursor, so other queries may be issued while the
+        caller is still iterating.
+        """
+        cursor = self.conn.execute(query, params)
+        try:
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    return
+                yield from rows
+        finally:
+            cursor.close()
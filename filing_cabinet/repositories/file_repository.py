@@ -1,9 +1,48 @@
 """File repository for the filing cabinet."""
+import functools
 import sqlite3
-from typing import Optional, List, Dict, Any
+from typing import Optional, Iterable, Iterator, List, Dict, Any, Tuple
 from ..models.file import File
 from .base import BaseRepository
 
+# Lookup statements are kept constant so sqlite's statement cache reuses
+# their prepared plans across calls
+_FILE_COLUMNS = "id, checksum, name, size, path, mime_type, created_at"
+GET_BY_ID_SQL = f"SELECT {_FILE_COLUMNS} FROM file WHERE id = ?"
+GET_BY_CHECKSUM_SQL = f"SELECT {_FILE_COLUMNS} FROM file WHERE checksum = ?"
+# A (checksum, path) pair fully determines the row, so a file that is
+# already recorded is left alone rather than deleted and re-inserted
+_SAVE_SQL_TEMPLATE = """
+    INSERT INTO file (checksum, name, size, path, mime_type)
+    VALUES {}
+    ON CONFLICT(checksum, path) DO NOTHING
+"""
+SAVE_SQL = _SAVE_SQL_TEMPLATE.format("(?, ?, ?, ?, ?)")
+# Rows per multi-row INSERT in save_many: 5 parameters each, kept under the
+# 999-variable limit of older sqlite builds
+SAVE_MANY_ROWS = 199
+# Paths per stat_cache lookup in get_stat_cache, with the algorithm
+# parameter likewise under the 999-variable limit
+STAT_CACHE_LOOKUP_PATHS = 900
+SEARCH_SQL = f"""
+    SELECT {_FILE_COLUMNS} FROM file
+    WHERE name LIKE ? OR path LIKE ?
+    ORDER BY created_at DESC
+"""
+
+@functools.lru_cache(maxsize=None)
+def _save_rows_sql(rows: int) -> str:
+    """INSERT statement for ``rows`` files, built once per row count."""
+    return _SAVE_SQL_TEMPLATE.format(", ".join(["(?, ?, ?, ?, ?)"] * rows))
+
+@functools.lru_cache(maxsize=None)
+def _stat_cache_sql(paths: int) -> str:
+    """stat_cache lookup for ``paths`` paths, built once per path count."""
+    return f"""
+        SELECT path, device, inode, mtime_ns, size, checksum FROM stat_cache
+        WHERE algorithm = ? AND path IN ({", ".join(["?"] * paths)})
+    """
+
 class FileRepository(BaseRepository):
     """Repository for managing files in the database."""
 
@@ -11,7 +50,7 @@ class FileRepository(BaseRepository):
         """Initialize the repository with database path."""
         super().__init__(db_path)
         self.connect()  # Connect immediately
-        self.create_table()
+        self.ensure_tables()
 
     def __del__(self):
         """Cleanup database connection."""
@@ -31,50 +70,160 @@ class FileRepository(BaseRepository):
                 UNIQUE(checksum, path)
             )
         """)
+        # Running totals for get_statistics, kept current by triggers so
+        # reading them doesn't scan the file table
+        self.execute("""
+            CREATE TABLE IF NOT EXISTS file_stats (
+                id INTEGER PRIMARY KEY CHECK (id = 0),
+                total_files INTEGER NOT NULL,
+                total_size INTEGER NOT NULL
+            )
+        """)
+        self.execute("""
+            CREATE TRIGGER IF NOT EXISTS file_stats_insert AFTER INSERT ON file
+            BEGIN
+                UPDATE file_stats
+                SET total_files = total_files + 1, total_size = total_size + NEW.size
+                WHERE id = 0;
+            END
+        """)
+        self.execute("""
+            CREATE TRIGGER IF NOT EXISTS file_stats_delete AFTER DELETE ON file
+            BEGIN
+                UPDATE file_stats
+                SET total_files = total_files - 1, total_size = total_size - OLD.size
+                WHERE id = 0;
+            END
+        """)
+        self.execute("""
+            CREATE TRIGGER IF NOT EXISTS file_stats_update AFTER UPDATE OF size ON file
+            BEGIN
+                UPDATE file_stats
+                SET total_size = total_size - OLD.size + NEW.size
+                WHERE id = 0;
+            END
+        """)
+        # Seeded after the triggers exist, so rows written in between are
+        # counted here rather than lost; a no-op once the row exists
+        self.execute("""
+            INSERT OR IGNORE INTO file_stats (id, total_files, total_size)
+            SELECT 0, COUNT(*), COALESCE(SUM(size), 0) FROM file
+        """)
+        self.execute("""
+            CREATE TABLE IF NOT EXISTS file_metadata (
+                checksum TEXT PRIMARY KEY,
+                mime_type TEXT,
+                text TEXT,
+                metadata BLOB NOT NULL
+            )
+        """)
+        # Checksums of indexed paths with the stat data they were taken
+        # at; a path whose stat still matches needn't be hashed again
+        self.execute("""
+            CREATE TABLE IF NOT EXISTS stat_cache (
+                path TEXT NOT NULL,
+                algorithm TEXT NOT NULL,
+                device INTEGER NOT NULL,
+                inode INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                checksum TEXT NOT NULL,
+                PRIMARY KEY (path, algorithm)
+            )
+        """)
 
     def save(self, file: File) -> None:
         """Save a file to the database."""
         self.execute(
-            """
-            INSERT OR REPLACE INTO file (
-                checksum, name, size, path, mime_type
-            ) VALUES (?, ?, ?, ?, ?)
-            """,
+            SAVE_SQL,
             (file.checksum, file.name, file.size, file.path, file.mime_type)
         )
 
+    def save_many(self, files: Iterable[File]) -> None:
+        """Save several files in one transaction.
+        
+        Files are written SAVE_MANY_ROWS at a time as multi-row INSERTs,
+        which sqlite runs markedly faster than one executemany row each.
+        """
+        files = list(files)
+        with self.transaction():
+            for start in range(0, len(files), SAVE_MANY_ROWS):
+                group = files[start:start + SAVE_MANY_ROWS]
+                params = []
+                for file in group:
+                    params += (file.checksum, file.name, file.size, file.path, file.mime_type)
+                self.execute(_save_rows_sql(len(group)), params)
+
     def get_by_id(self, file_id: str) -> Optional[File]:
         """Get a file by its ID."""
-        row = self.fetch_one(
-            "SELECT * FROM file WHERE id = ?",
-            (file_id,)
-        )
+        row = self.fetch_one(GET_BY_ID_SQL, (file_id,))
         if row:
-            file = File(row['path'])
-            return file
+            return File.from_record(row)
         return None
 
     def get_by_checksum(self, checksum: str) -> Optional[File]:
         """Get a file by its checksum."""
-        row = self.fetch_one(
-            "SELECT * FROM file WHERE checksum = ?",
-            (checksum,)
-        )
+        row = self.fetch_one(GET_BY_CHECKSUM_SQL, (checksum,))
         if row:
-            file = File(row['path'])
-            return file
+            return File.from_record(row)
         return None
 
-    def index_file(self, file_path: str) -> None:
+    def index_file(self, file_path: str, hash_algorithm: str = 'sha256') -> None:
         """Index a file's basic information."""
-        file = File(file_path)
+        file = File(file_path, hash_algorithm)
+        self.execute(
+            SAVE_SQL,
+            (file.checksum, file.name, file.size, file.path, file.mime_type)
+        )
+
+    def save_metadata(self, checksum: str, mime_type: Optional[str],
+                      text: Optional[str], metadata: bytes) -> None:
+        """Save the processing results for a file's content."""
         self.execute(
             """
-            INSERT OR REPLACE INTO file (
-                checksum, name, size, path, mime_type
-            ) VALUES (?, ?, ?, ?, ?)
+            INSERT OR REPLACE INTO file_metadata (
+                checksum, mime_type, text, metadata
+            ) VALUES (?, ?, ?, ?)
             """,
-            (file.checksum, file.name, file.size, file.path, file.mime_type)
+            (checksum, mime_type, text, metadata)
+        )
+
+    def get_metadata(self, checksum: str) -> Optional[bytes]:
+        """Get the serialized processing results for a checksum."""
+        row = self.fetch_one(
+            "SELECT metadata FROM file_metadata WHERE checksum = ?",
+            (checksum,)
+        )
+        return row['metadata'] if row else None
+
+    def get_stat_cache(self, algorithm: str, paths: Iterable[str]
+                       ) -> Dict[str, Tuple[Tuple[int, int, int, int], str]]:
+        """Map those of ``paths`` that are cached to their (device, inode, mtime_ns, size) and checksum.
+        
+        Only the requested paths are loaded, STAT_CACHE_LOOKUP_PATHS per query.
+        """
+        paths = list(paths)
+        cached = {}
+        for start in range(0, len(paths), STAT_CACHE_LOOKUP_PATHS):
+            group = paths[start:start + STAT_CACHE_LOOKUP_PATHS]
+            self.cursor.execute(_stat_cache_sql(len(group)), (algorithm, *group))
+            cached.update(
+                (path, ((device, inode, mtime_ns, size), checksum))
+                for path, device, inode, mtime_ns, size, checksum in self.cursor
+            )
+        return cached
+
+    def save_stat_cache(self, algorithm: str,
+                        entries: Iterable[Tuple[str, Tuple[int, int, int, int], str]]) -> None:
+        """Record the stat data each (path, signature, checksum) was hashed at."""
+        self.executemany(
+            """
+            INSERT OR REPLACE INTO stat_cache (
+                path, algorithm, device, inode, mtime_ns, size, checksum
+            ) VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            [(path, algorithm, *signature, checksum)
+             for path, signature, checksum in entries]
         )
 
     def delete(self, file_id: str) -> bool:
@@ -87,24 +236,18 @@ class FileRepository(BaseRepository):
 
     def search(self, query: str) -> List[File]:
         """Search for files by name or path."""
-        rows = self.fetch_all(
-            """
-            SELECT * FROM file 
-            WHERE name LIKE ? OR path LIKE ?
-            ORDER BY created_at DESC
-            """,
-            (f"%{query}%", f"%{query}%")
-        )
-        return [File(row['path']) for row in rows]
+        return list(self.iter_search(query))
+
+    def iter_search(self, query: str) -> Iterator[File]:
+        """Yield files matching by name or path without loading them all first."""
+        for row in self.fetch_iter(SEARCH_SQL, (f"%{query}%", f"%{query}%")):
+            yield File.from_record(row)
 
     def get_statistics(self) -> Dict[str, Any]:
         """Get statistics about the files."""
-        stats = self.fetch_one("""
-            SELECT 
-                COUNT(*) as total_files,
-                COALESCE(SUM(size), 0) as total_size
-            FROM file
-        """)
+        stats = self.fetch_one(
+            "SELECT total_files, total_size FROM file_stats WHERE id = 0"
+        )
         return {
             "total_files": stats['total_files'],
             "total_size": stats['total_size']
@@ -0,0 +1,40 @@
+"""OCR cache repository for the filing cabinet."""
+from typing import Optional
+from .base import BaseRepository
+
+class OcrCacheRepository(BaseRepository):
+    """Repository for OCR results keyed by a content hash of the OCR'd image."""
+
+    def __init__(self, db_path: str):
+        """Initialize the repository with database path."""
+        super().__init__(db_path)
+        self.connect()
+        self.ensure_tables()
+
+    def __del__(self):
+        """Cleanup database connection."""
+        self.close()
+
+    def create_table(self) -> None:
+        """Create the OCR cache table if it doesn't exist."""
+        self.execute("""
+            CREATE TABLE IF NOT EXISTS ocr_cache (
+                key BLOB PRIMARY KEY,
+                text TEXT NOT NULL
+            )
+        """)
+
+    def get(self, key: bytes) -> Optional[str]:
+        """Get the cached OCR text for a key."""
+        row = self.fetch_one(
+            "SELECT text FROM ocr_cache WHERE key = ?",
+            (key,)
+        )
+        return row['text'] if row else None
+
+    def put(self, key: bytes, text: str) -> None:
+        """Cache the OCR text for a key."""
+        self.execute(
+            "INSERT OR IGNORE INTO ocr_cache (key, text) VALUES (?, ?)",
+            (key, text)
+        )
@@ -1,22 +1,145 @@
 """Document processor for extracting information from files."""
 import os
+import collections
+import copy
 import json
 import platform
+import re
+import threading
 import uuid
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-import PyPDF2
-from typing import Dict, Any, List, Optional
+from itertools import repeat
+from typing import TYPE_CHECKING, Dict, Any, Iterable, Iterator, List, Optional, Tuple
+from ..utils.file_utils import cached_checksum, stat_signature
+from ..utils.pdf_utils import open_pdf
+
+if TYPE_CHECKING:
+    import pypdfium2 as pdfium
+    from ..config import ConfigService
+
+# Entity patterns, compiled once at import. ASCII-only classes: \d would
+# otherwise accept digits of every script and take re's slower Unicode path
+_DATE_RE = re.compile(r'\d{4}-\d{2}-\d{2}', re.ASCII)  # YYYY-MM-DD
+_AMOUNT_RE = re.compile(r'\$\d+(?:\.\d{2})?(?:\s*(?:USD|EUR|GBP))?', re.ASCII)  # $ format
+
+# Large PDFs have their text extracted by several processes, each over its
+# own range of at least this many pages (so from twice this many pages on);
+# for fewer pages a pool costs more to start than it saves
+PDF_PARALLEL_MIN_PAGES = 64
+PDF_WORKERS = os.cpu_count() or 1
+# Results kept per processor for files that haven't changed since
+RESULT_CACHE_SIZE = 1024
+# (absolute path, hash algorithm, stat signature) of a cached result
+_ResultKey = Tuple[str, str, Tuple[int, int, int, int]]
+# Documents handed to a process_many worker at a time, to amortize pickling
+PROCESS_MANY_CHUNK_SIZE = 8
+
+# The DocumentProcessor of a process_many worker process
+_worker_processor = None
+
+def _page_text(page: 'pdfium.PdfPage') -> str:
+    """Extract a PDFium page's text, then release the page."""
+    try:
+        textpage = page.get_textpage()
+        try:
+            return textpage.get_text_range()
+        finally:
+            textpage.close()
+    finally:
+        page.close()
+
+def _pdf_page_texts(file_path: str, start: int, stop: int) -> List[str]:
+    """Extract the text of pages ``start`` to ``stop`` (exclusive) of a PDF file.
+    
+    Runs in pool worker processes, so it opens the document itself.
+    """
+    with open_pdf(file_path) as pdf:
+        return [_page_text(pdf[index]) for index in range(start, stop)]
+
+def _init_worker(db_path: str) -> None:
+    """Set up a process_many worker with its own configuration connection.
+    
+    Documents are already spread over the workers, so each extracts its
+    PDF pages sequentially.
+    """
+    from ..config import get_config
+    
+    global _worker_processor
+    _worker_processor = DocumentProcessor(get_config(db_path), pdf_workers=1)
+
+def _process_in_worker(file_path: str) -> Dict[str, Any]:
+    """Process a document in a process_many worker."""
+    return _worker_processor.process(file_path)
 
 class DocumentProcessor:
     """Processor for extracting information from documents."""
     
-    def __init__(self, config):
-        """Initialize with configuration."""
+    def __init__(self, config: 'ConfigService', pdf_workers: Optional[int] = None) -> None:
+        """Initialize with configuration.
+        
+        ``pdf_workers`` overrides the ``file.process.workers`` setting for
+        the number of processes extracting a large PDF's pages.
+        """
         self.config = config
+        self.pdf_workers = pdf_workers
         self._device_id = str(uuid.uuid4())
+        # Results by (path, hash algorithm, stat signature), least recently
+        # used first; FileService calls process from several threads
+        self._results: 'collections.OrderedDict[_ResultKey, Dict[str, Any]]' = collections.OrderedDict()
+        self._results_lock = threading.Lock()
         
     def process(self, file_path: str) -> Dict[str, Any]:
-        """Process a document and extract information."""
+        """Process a document and extract information.
+        
+        A file processed before by this processor, with the same device,
+        inode, mtime and size and the same hash algorithm, gets a copy of
+        the earlier result, with the processing times of this call.
+        """
+        file_path = os.path.abspath(file_path)
+        key = (file_path, self.config.get('file.hash.algorithm', 'sha256'),
+               stat_signature(os.stat(file_path)))
+        with self._results_lock:
+            result = self._results.get(key)
+            if result is not None:
+                self._results.move_to_end(key)
+        if result is None:
+            result = self._process(file_path)
+            with self._results_lock:
+                self._results[key] = result
+                if len(self._results) > RESULT_CACHE_SIZE:
+                    self._results.popitem(last=False)
+        # Copied so callers can't change the cached result
+        result = copy.deepcopy(result)
+        now = datetime.now().isoformat()
+        result["filing_cabinet"]["processed_at"] = now
+        result["processing"]["timestamp"] = now
+        return result
+    
+    def process_many(self, file_paths: Iterable[str], workers: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Process several documents in worker processes, returning results in order.
+        
+        ``workers`` defaults to ``file.process.workers``, or the CPU count if
+        unset. Workers are spawned rather than forked, so none inherits this
+        process's database connections; each opens the configuration itself.
+        Each worker has its own PDFium, so their PDFs are extracted in parallel.
+        """
+        file_paths = list(file_paths)
+        workers = min(workers or self.config.get('file.process.workers', 0) or PDF_WORKERS,
+                      len(file_paths))
+        if workers <= 1:
+            return [self.process(file_path) for file_path in file_paths]
+        
+        with ProcessPoolExecutor(max_workers=workers,
+                                 mp_context=multiprocessing.get_context('spawn'),
+                                 initializer=_init_worker,
+                                 initargs=(self.config.db_path,)) as executor:
+            return list(executor.map(_process_in_worker, file_paths,
+                                     chunksize=PROCESS_MANY_CHUNK_SIZE))
+    
+    def _process(self, file_path: str) -> Dict[str, Any]:
+        """Process a document, bypassing the result cache."""
         try:
             # First try AI processing
             return self._process_with_ai(file_path)
@@ -26,7 +149,7 @@ class DocumentProcessor:
     
     def _process_with_ai(self, file_path: str) -> Dict[str, Any]:
         """Process document using AI."""
-        api_key = self.config.get('openai.api_key')
+        api_key = self.config.get('openai.api_key') if self.config.has('openai.api_key') else None
         if not api_key:
             raise ValueError("OpenAI API key not configured")
             
@@ -35,19 +158,25 @@ class DocumentProcessor:
     
     def _process_traditional(self, file_path: str, fallback_error: Optional[Exception] = None) -> Dict[str, Any]:
         """Process document using traditional methods."""
+        # One stat serves the checksum cache and the device data
+        stat = os.stat(file_path)
+        if file_path.lower().endswith('.pdf'):
+            content, pdf_metadata = self._extract_pdf(file_path)
+        else:
+            content, pdf_metadata = self._extract_text_content(file_path), {}
         result = {
             "filing_cabinet": {
-                "checksum": self._calculate_checksum(file_path),
+                "checksum": cached_checksum(file_path, self.config.get('file.hash.algorithm', 'sha256'), stat),
                 "processed_at": datetime.now().isoformat(),
                 "version": "0.3.3"  # TODO: Get from package version
             },
-            "device_data": self._get_device_data(file_path),
-            "content": self._extract_content(file_path),
+            "device_data": self._get_device_data(stat),
+            "content": content,
             "document_info": {
                 "type": "unknown",
                 "purpose": ""
             },
-            "pdf_metadata": self._extract_pdf_metadata(file_path),
+            "pdf_metadata": pdf_metadata,
             "processing": {
                 "method": "traditional",
                 "fallback_reason": self._format_error(fallback_error) if fallback_error else None,
@@ -57,18 +186,8 @@ class DocumentProcessor:
         
         return result
     
-    def _calculate_checksum(self, file_path: str) -> str:
-        """Calculate file checksum."""
-        import hashlib
-        sha256_hash = hashlib.sha256()
-        with open(file_path, "rb") as f:
-            for byte_block in iter(lambda: f.read(4096), b""):
-                sha256_hash.update(byte_block)
-        return sha256_hash.hexdigest()
-    
-    def _get_device_data(self, file_path: str) -> Dict[str, Any]:
-        """Get device and file information."""
-        stat = os.stat(file_path)
+    def _get_device_data(self, stat: os.stat_result) -> Dict[str, Any]:
+        """Get device and file information from the file's stat result."""
         return {
             "created_at": datetime.fromtimestamp(stat.st_ctime).isoformat(),
             "modified_at": datetime.fromtimestamp(stat.st_mtime).isoformat(),
@@ -83,24 +202,50 @@ class DocumentProcessor:
             }
         }
     
-    def _extract_content(self, file_path: str) -> Dict[str, Any]:
-        """Extract content from file."""
-        if file_path.lower().endswith('.pdf'):
-            return self._extract_pdf_content(file_path)
-        else:
-            return self._extract_text_content(file_path)
+    def _extract_pdf(self, file_path: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Extract content and metadata from a PDF file, parsing it once."""
+        # PDFium extracts text natively, far faster than PyPDF2's pure-Python
+        # content stream interpreter
+        try:
+            with open_pdf(file_path) as pdf:
+                metadata = self._extract_pdf_metadata(pdf)
+                page_count = len(pdf)
+                workers = min(self.pdf_workers or self.config.get('file.process.workers', 0) or PDF_WORKERS,
+                              page_count // PDF_PARALLEL_MIN_PAGES)
+                if workers <= 1:
+                    # Pages are closed as soon as their text is taken, so
+                    # PDFium holds one parsed page at a time
+                    return self._extract_pdf_content(_page_text(page) for page in pdf), metadata
+        except Exception as e:
+            return self._pdf_content(f"Failed to extract PDF text: {str(e)}"), {}
+        # Outside the block: worker processes have their own PDFium, and
+        # other threads' PDFs needn't wait for them
+        return self._extract_pdf_content(self._iter_pdf_range_texts(file_path, page_count, workers)), metadata
     
-    def _extract_pdf_content(self, file_path: str) -> Dict[str, Any]:
-        """Extract content from PDF file."""
-        text = ""
+    def _extract_pdf_content(self, page_texts: Iterable[str]) -> Dict[str, Any]:
+        """Build the content section from a PDF's page texts, in order."""
         try:
-            with open(file_path, 'rb') as file:
-                reader = PyPDF2.PdfReader(file)
-                for page in reader.pages:
-                    text += page.extract_text() + "\n"
+            # Joined once; growing a string page by page copies it every time
+            text = "\n".join(page_texts)
         except Exception as e:
             text = f"Failed to extract PDF text: {str(e)}"
         
+        return self._pdf_content(text)
+    
+    def _iter_pdf_range_texts(self, file_path: str, page_count: int, workers: int) -> Iterator[str]:
+        """Yield the text of each page of a PDF file, extracted by worker processes."""
+        # One contiguous page range per worker, results in page order
+        bounds = [page_count * i // workers for i in range(workers + 1)]
+        # Spawned, not forked: this may run on a FileService worker
+        # thread, and a fork would copy sqlite and PDFium state mid-use
+        with ProcessPoolExecutor(max_workers=workers,
+                                 mp_context=multiprocessing.get_context('spawn')) as executor:
+            for texts in executor.map(_pdf_page_texts, repeat(file_path),
+                                      bounds[:-1], bounds[1:]):
+                yield from texts
+    
+    def _pdf_content(self, text: str) -> Dict[str, Any]:
+        """Build the content section for extracted PDF text."""
         return {
             "text": text.strip(),
             "tables": [],
@@ -133,8 +278,6 @@ class DocumentProcessor:
     
     def _extract_entities(self, text: str) -> Dict[str, List[str]]:
         """Extract entities from text."""
-        import re
-        
         entities = {
             "people": [],
             "organizations": [],
@@ -143,24 +286,17 @@ class DocumentProcessor:
         }
         
         # Simple date extraction (YYYY-MM-DD format)
-        date_pattern = r'\d{4}-\d{2}-\d{2}'
-        entities["dates"] = re.findall(date_pattern, text)
+        entities["dates"] = _DATE_RE.findall(text)
         
         # Simple amount extraction ($ format)
-        amount_pattern = r'\$\d+(?:\.\d{2})?(?:\s*(?:USD|EUR|GBP))?'
-        entities["amounts"] = re.findall(amount_pattern, text)
+        entities["amounts"] = _AMOUNT_RE.findall(text)
         
         return entities
     
-    def _extract_pdf_metadata(self, file_path: str) -> Dict[str, Any]:
-        """Extract PDF metadata."""
-        if not file_path.lower().endswith('.pdf'):
-            return {}
-            
+    def _extract_pdf_metadata(self, pdf: 'pdfium.PdfDocument') -> Dict[str, Any]:
+        """Extract metadata from an open PDF document."""
         try:
-            with open(file_path, 'rb') as file:
-                reader = PyPDF2.PdfReader(file)
-                return dict(reader.metadata or {})
+            return pdf.get_metadata_dict(skip_empty=True)
         except Exception:
             return {}
     
@@ -1,4 +1,5 @@
-from typing import Dict, List, Tuple, Optional, Any, Set
+from typing import Dict, List, Tuple, Optional, Any, Set, Pattern
+import functools
 import pdfplumber
 import re
 from dataclasses import dataclass
@@ -12,6 +13,25 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Patterns used on every document are compiled once at import
+KEY_VALUE_PATTERNS = (
+    re.compile(r"([A-Za-zäöüÄÖÜß\s]+):\s*([^\n]+)"),  # Key: Value
+    re.compile(r"([A-Za-zäöüÄÖÜß\s]+)\s+(\d[\d\s.,]+(?:EUR|€)?(?:\s*p\.a\.)?)")  # Key Amount
+)
+TRANSACTION_LINE_PATTERN = re.compile(r"(\d{2}\.\d{2}\.\d{4})\s+([^-\d].*?)(?:\s+|$)([-\d.,]+)?\s*$")
+MANDATE_PATTERN = re.compile(r"Mandat:([^\n]+)")
+REFERENCE_PATTERN = re.compile(r"Referenz:([^\n]+)")
+BALANCE_PATTERNS = {
+    "opening_balance": re.compile(r"Alter\s+Saldo\s+([\d.,]+)\s*Euro"),
+    "closing_balance": re.compile(r"Neuer\s+Saldo\s+([\d.,]+)\s*Euro"),
+    "overdraft_limit": re.compile(r"Eingeräumte\s+Kontoüberziehung\s+([\d.,]+)\s*Euro")
+}
+
+@functools.lru_cache(maxsize=None)
+def _compile(pattern: str, flags: int = 0) -> Pattern[str]:
+    """Compile a template pattern once, skipping re's bounded cache on later uses."""
+    return re.compile(pattern, flags)
+
 @dataclass
 class DocumentZone:
     name: str
@@ -56,7 +76,7 @@ class DocumentTemplateService:
         
         # Try to initialize OpenAI client, but don't fail if key is missing
         try:
-            api_key = self.config.get('openai.api_key', None)
+            api_key = self.config.get('openai.api_key') if self.config.has('openai.api_key') else None
             if api_key:
                 self.openai_client = OpenAI(api_key=api_key)
             else:
@@ -443,7 +463,7 @@ class DocumentTemplateService:
                 
                 # Extract metadata using patterns
                 for key, pattern in template.metadata_patterns.items():
-                    matches = re.finditer(pattern, first_page_text, re.IGNORECASE | re.MULTILINE)
+                    matches = _compile(pattern, re.IGNORECASE | re.MULTILINE).finditer(first_page_text)
                     for match in matches:
                         value = match.group(1)
                         # Clean and standardize values
@@ -492,13 +512,8 @@ class DocumentTemplateService:
         """Extract key-value pairs from text."""
         pairs = {}
         # Look for patterns like "Key: Value" or "Key Value"
-        patterns = [
-            r"([A-Za-zäöüÄÖÜß\s]+):\s*([^\n]+)",  # Key: Value
-            r"([A-Za-zäöüÄÖÜß\s]+)\s+(\d[\d\s.,]+(?:EUR|€)?(?:\s*p\.a\.)?)"  # Key Amount
-        ]
-        
-        for pattern in patterns:
-            matches = re.finditer(pattern, text)
+        for pattern in KEY_VALUE_PATTERNS:
+            matches = pattern.finditer(text)
             for match in matches:
                 key = match.group(1).strip()
                 value = match.group(2).strip()
@@ -513,7 +528,7 @@ class DocumentTemplateService:
         for template_name, template in self.templates.items():
             score = 0
             for pattern in template.identifier_patterns:
-                matches = re.finditer(pattern, text, re.IGNORECASE)
+                matches = _compile(pattern, re.IGNORECASE).finditer(text)
                 score += sum(1 for _ in matches)
             scores[template_name] = score
 
@@ -551,7 +566,7 @@ class DocumentTemplateService:
         
         # Find pattern matches
         for pattern in zone.patterns:
-            matches = re.finditer(pattern, extracted["text"], re.IGNORECASE | re.MULTILINE)
+            matches = _compile(pattern, re.IGNORECASE | re.MULTILINE).finditer(extracted["text"])
             for match in matches:
                 extracted["matches"].append({
                     "pattern": pattern,
@@ -657,7 +672,7 @@ class DocumentTemplateService:
             
             for line in text.split("\n"):
                 # Look for transaction patterns
-                date_match = re.search(r"(\d{2}\.\d{2}\.\d{4})\s+([^-\d].*?)(?:\s+|$)([-\d.,]+)?\s*$", line)
+                date_match = TRANSACTION_LINE_PATTERN.search(line)
                 if date_match:
                     if current_transaction:
                         transactions.append(current_transaction)
@@ -680,8 +695,8 @@ class DocumentTemplateService:
                 
                 # Look for additional transaction information
                 elif current_transaction:
-                    mandate_match = re.search(r"Mandat:([^\n]+)", line)
-                    reference_match = re.search(r"Referenz:([^\n]+)", line)
+                    mandate_match = MANDATE_PATTERN.search(line)
+                    reference_match = REFERENCE_PATTERN.search(line)
                     
                     if mandate_match:
                         current_transaction["mandate"] = mandate_match.group(1).strip()
@@ -699,15 +714,9 @@ class DocumentTemplateService:
                 metadata["content"]["transactions"] = transactions
 
             # Extract balance information
-            balance_patterns = {
-                "opening_balance": r"Alter\s+Saldo\s+([\d.,]+)\s*Euro",
-                "closing_balance": r"Neuer\s+Saldo\s+([\d.,]+)\s*Euro",
-                "overdraft_limit": r"Eingeräumte\s+Kontoüberziehung\s+([\d.,]+)\s*Euro"
-            }
-            
             balances = {}
-            for key, pattern in balance_patterns.items():
-                match = re.search(pattern, text)
+            for key, pattern in BALANCE_PATTERNS.items():
+                match = pattern.search(text)
                 if match:
                     try:
                         amount = float(match.group(1).replace(".", "").replace(",", "."))
@@ -1,30 +1,156 @@
 import os
-import json
+import functools
+import hashlib
 import stat
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
-from PIL import Image
-import pytesseract
-from PyPDF2 import PdfReader
-from pdf2image import convert_from_path
-import magic
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Iterator, Sequence, Union, TYPE_CHECKING
 import re
 from pathlib import Path
-import langdetect
-import tabula
-import pdfplumber
+import orjson
 from importlib.metadata import version, PackageNotFoundError
 from .document_template_service import DocumentTemplateService
 from ..config import get_config
+from ..repositories.ocr_cache_repository import OcrCacheRepository
+from ..utils.file_utils import calculate_checksum, get_mime_type
+from ..utils.pdf_utils import PDFIUM_LOCK, open_pdf
 from ..errors import (
     FilingError, FileNotFoundError, UnsupportedFileTypeError,
     ProcessingError, ConfigurationError, AIServiceError
 )
-from openai import OpenAI
 import logging
 
+# PDF/OCR libraries are imported where they are used, keeping them off the
+# import path of callers that never process a document
+if TYPE_CHECKING:
+    from PIL import Image
+
 logger = logging.getLogger(__name__)
 
+# Each tesseract process already uses ~2 threads internally
+OCR_WORKERS = max((os.cpu_count() or 2) // 2, 1)
+# Pages rasterized at a time, bounding peak memory on large PDFs
+OCR_CHUNK_SIZE = 10
+# Shorter image side (in pixels) above which images are downscaled before OCR
+OCR_MAX_SHORT_SIDE = 2500
+# Resolution PDF pages are rendered at for OCR
+OCR_RENDER_DPI = 200
+# Pages with less embedded text than this are treated as scans and OCR'd
+OCR_MIN_PAGE_TEXT = 50
+
+# Entity patterns, compiled once at import
+DATE_PATTERNS = (
+    re.compile(r'\d{4}-\d{2}-\d{2}'),  # YYYY-MM-DD
+    re.compile(r'\d{2}\.\d{2}\.\d{4}'),  # DD.MM.YYYY
+    re.compile(r'\d{2}/\d{2}/\d{4}')   # DD/MM/YYYY
+)
+AMOUNT_PATTERNS = (
+    re.compile(r'\$\s*\d+(?:,\d{3})*(?:\.\d{2})?'),  # USD
+    re.compile(r'€\s*\d+(?:,\d{3})*(?:\.\d{2})?'),   # EUR
+    re.compile(r'\d+(?:,\d{3})*(?:\.\d{2})?\s*(?:EUR|USD|€|\$)')  # Amount followed by currency
+)
+
+_tesseract = threading.local()
+
+@functools.lru_cache(maxsize=None)
+def _tesserocr() -> Any:
+    """Import tesserocr on first use, or return None if it isn't installed."""
+    try:
+        import tesserocr
+    except ImportError:  # Optional, see the "ocr" extra
+        return None
+    return tesserocr
+
+def _tesseract_api(lang: str, psm: int) -> Any:
+    """Get this thread's tesserocr API for the language and page segmentation mode."""
+    apis = getattr(_tesseract, 'apis', None)
+    if apis is None:
+        apis = _tesseract.apis = {}
+    if (lang, psm) not in apis:
+        apis[(lang, psm)] = _tesserocr().PyTessBaseAPI(lang=lang, psm=psm)
+    return apis[(lang, psm)]
+
+def _prep_for_ocr(image: 'Image.Image') -> 'Image.Image':
+    """Convert an image to grayscale and downscale oversized scans.
+
+    Tesseract binarizes its input anyway and its runtime grows with the pixel
+    count, so color and resolution beyond ~300 DPI only cost time.
+    """
+    from PIL import Image
+
+    if image.mode != 'L':
+        image = image.convert('L')
+    scale = OCR_MAX_SHORT_SIDE / min(image.size)
+    if scale < 1:
+        image = image.resize(
+            (round(image.width * scale), round(image.height * scale)),
+            Image.LANCZOS
+        )
+    return image
+
+def _image_to_string(image: Union['Image.Image', str], lang: str = 'eng', psm: int = 3) -> str:
+    """OCR an image or image file, in-process through tesserocr when it is installed.
+
+    pytesseract hands file paths straight to tesseract, while in-memory
+    images (PIL or numpy alike) are first re-encoded to a temporary file.
+    """
+    if _tesserocr() is None:
+        import pytesseract
+        return pytesseract.image_to_string(image, lang=lang, config=f'--psm {psm}')
+    api = _tesseract_api(lang, psm)
+    if isinstance(image, str):
+        api.SetImageFile(image)
+    else:
+        api.SetImage(image)
+    return api.GetUTF8Text()
+
+def _ocr_cache_key(file_path: str, kind: bytes) -> bytes:
+    """Hash an image file's bytes into an OCR cache key."""
+    # Streamed, so a large rendered page is never held in memory whole
+    hasher = hashlib.blake2b(digest_size=16, person=kind)
+    with open(file_path, 'rb', buffering=0) as f:
+        if hasattr(hashlib, 'file_digest'):
+            return hashlib.file_digest(f, lambda: hasher).digest()
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            hasher.update(block)
+    return hasher.digest()
+
+def _ocr_image_file(image_path: str) -> str:
+    """OCR a single rendered page image."""
+    from PIL import Image
+
+    with Image.open(image_path) as image:
+        # Pages are rendered gray at OCR resolution, so they can usually be
+        # read from disk as-is; Image.open only parsed the header to tell
+        if image.mode == 'L' and min(image.size) <= OCR_MAX_SHORT_SIDE:
+            return _image_to_string(image_path)
+        return _image_to_string(_prep_for_ocr(image))
+
+@functools.lru_cache(maxsize=None)
+def _package_version() -> str:
+    """Installed filing-cabinet version, looked up once per process."""
+    try:
+        return version('filing-cabinet')
+    except PackageNotFoundError:
+        return "0.1.0"  # Default version if package is not installed
+
+@functools.lru_cache(maxsize=None)
+def _device_info() -> Dict[str, str]:
+    """Describe this machine; it doesn't change while the process runs."""
+    import platform
+    import socket
+    import uuid
+
+    return {
+        "hostname": socket.gethostname(),
+        "platform": platform.system(),
+        "platform_version": platform.version(),
+        "platform_machine": platform.machine(),
+        "device_id": str(uuid.UUID(int=uuid.getnode()))
+    }
+
 class FileProcessorService:
     def __init__(self, db_path: str):
         """Initialize the file processor service."""
@@ -36,13 +162,15 @@ class FileProcessorService:
             'image/tiff'
         }
         self.template_service = DocumentTemplateService()
+        self.ocr_cache = OcrCacheRepository(db_path)
         self.config = get_config(db_path)
         self.openai_client = None
         
         # Try to initialize OpenAI client, but don't fail if key is missing
         try:
-            api_key = self.config.get('openai.api_key', None)
+            api_key = self.config.get('openai.api_key') if self.config.has('openai.api_key') else None
             if api_key:
+                from openai import OpenAI
                 self.openai_client = OpenAI(api_key=api_key)
                 logger.debug("OpenAI client initialized successfully")
             else:
@@ -50,14 +178,18 @@ class FileProcessorService:
         except Exception as e:
             logger.warning(f"Failed to initialize OpenAI client: {e}. AI-powered features will be disabled.")
 
-    def process_file(self, file_path: str) -> Optional[Dict[str, Any]]:
-        """Process a file to extract metadata and content."""
+    def process_file(self, file_path: str, workers: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """Process a file to extract metadata and content.
+
+        ``workers`` caps how many PDF pages are OCR'd in parallel, overriding
+        the ``file.process.workers`` setting.
+        """
         try:
             if not os.path.exists(file_path):
                 raise FileNotFoundError(file_path)
 
             # Get file mime type
-            mime_type = magic.from_file(file_path, mime=True)
+            mime_type = get_mime_type(file_path)
             if mime_type not in self.supported_mime_types:
                 raise UnsupportedFileTypeError(mime_type)
 
@@ -89,7 +221,7 @@ class FileProcessorService:
 
             # Process based on file type
             if mime_type == 'application/pdf':
-                self._process_pdf(file_path, metadata)
+                self._process_pdf(file_path, metadata, workers)
             else:
                 self._process_image(file_path, metadata)
 
@@ -135,37 +267,14 @@ class FileProcessorService:
     def _extract_basic_metadata(self, file_path: str) -> Dict[str, Any]:
         """Get file system metadata."""
         stat_info = os.stat(file_path)
-        import hashlib
-        import platform
-        import uuid
-        import socket
-
-        # Get package version
-        try:
-            pkg_version = version('filing-cabinet')
-        except PackageNotFoundError:
-            pkg_version = "0.1.0"  # Default version if package is not installed
-
-        # Calculate file checksum
-        sha256_hash = hashlib.sha256()
-        with open(file_path, "rb") as f:
-            for byte_block in iter(lambda: f.read(4096), b""):
-                sha256_hash.update(byte_block)
-        
-        # Get device information
-        device_info = {
-            "hostname": socket.gethostname(),
-            "platform": platform.system(),
-            "platform_version": platform.version(),
-            "platform_machine": platform.machine(),
-            "device_id": str(uuid.UUID(int=uuid.getnode()))
-        }
+        # Copied, since callers may add to the metadata they get back
+        device_info = dict(_device_info())
 
         return {
             "filing_cabinet": {
-                "checksum": sha256_hash.hexdigest(),
+                "checksum": calculate_checksum(file_path, self.config.get('file.hash.algorithm', 'sha256')),
                 "processed_at": datetime.now().isoformat(),
-                "version": pkg_version
+                "version": _package_version()
             },
             "device_data": {
                 "created_at": datetime.fromtimestamp(stat_info.st_ctime).isoformat(),
@@ -178,6 +287,8 @@ class FileProcessorService:
 
     def _process_image(self, file_path: str, metadata: Dict[str, Any]) -> Dict[str, Any]:
         """Process an image file."""
+        from PIL import Image
+
         image = Image.open(file_path)
         
         # Image metadata
@@ -189,17 +300,25 @@ class FileProcessorService:
             "exif": {k: str(v) for k, v in image.getexif().items()} if hasattr(image, 'getexif') else {}
         }
         
-        # Detect language and perform OCR
-        sample_text = pytesseract.image_to_string(image)
-        lang = self._detect_language(sample_text)
+        cache_key = _ocr_cache_key(file_path, b'image')
+        text = self.ocr_cache.get(cache_key)
+        if text is None:
+            ocr_image = _prep_for_ocr(image)
+
+            # Detect language and perform OCR
+            sample_text = _image_to_string(ocr_image)
+            lang = self._detect_language(sample_text)
+            
+            # Perform OCR with detected language
+            text = _image_to_string(
+                ocr_image,
+                lang=('deu' if lang == 'de' else 'eng'),
+                psm=6
+            )
+            self.ocr_cache.put(cache_key, text)
         
-        # Perform OCR with detected language
         metadata["content"] = {
-            "text": pytesseract.image_to_string(
-                image,
-                lang=('deu' if lang == 'de' else 'eng'),
-                config='--psm 6'
-            ),
+            "text": text,
             "tables": [],
             "key_value_pairs": {},
             "entities": {
@@ -214,12 +333,14 @@ class FileProcessorService:
         
         return metadata
 
-    def _process_pdf(self, file_path: str, metadata: Dict[str, Any]) -> Dict[str, Any]:
+    def _process_pdf(self, file_path: str, metadata: Dict[str, Any],
+                     workers: Optional[int] = None) -> Dict[str, Any]:
         """Process a PDF file."""
+        import pdfplumber
+
         # First get basic PDF metadata
-        pdf = PdfReader(file_path)
-        pdf_metadata = pdf.metadata if pdf.metadata else {}
-        metadata["pdf_metadata"] = pdf_metadata
+        with open_pdf(file_path) as pdf:
+            metadata["pdf_metadata"] = pdf.get_metadata_dict(skip_empty=True)
 
         # Extract metadata using template-based processing
         template_results = self.template_service.process_document(file_path)
@@ -263,13 +384,11 @@ class FileProcessorService:
         else:
             # Fallback to basic processing if template matching fails
             with pdfplumber.open(file_path) as pdf:
-                text_content = []
+                page_texts = []
                 tables = []
                 
                 for page in pdf.pages:
-                    text = page.extract_text()
-                    if text:
-                        text_content.append(text)
+                    page_texts.append(page.extract_text() or "")
                     
                     page_tables = page.extract_tables()
                     if page_tables:
@@ -279,6 +398,16 @@ class FileProcessorService:
                                     "headers": table[0] if table else [],
                                     "data": table[1:] if table and len(table) > 1 else []
                                 })
+
+                # Only pages without a usable text layer (scans) need OCR
+                scanned = [
+                    i + 1 for i, text in enumerate(page_texts)
+                    if len(text.strip()) < OCR_MIN_PAGE_TEXT
+                ]
+                if scanned:
+                    for page_number, text in zip(scanned, self._ocr_pdf(file_path, scanned, workers)):
+                        page_texts[page_number - 1] = f"Page {page_number}: {text}"
+                text_content = [text for text in page_texts if text]
                 
                 metadata["content"] = {
                     "text": "\n\n".join(text_content),
@@ -299,6 +428,86 @@ class FileProcessorService:
 
         return metadata
 
+    def _ocr_pdf(self, file_path: str, pages: Optional[Sequence[int]] = None,
+                 workers: Optional[int] = None) -> List[str]:
+        """OCR pages of a PDF, returning the text of each page in order.
+
+        ``pages`` are ascending 1-based page numbers; all pages by default.
+        ``workers`` defaults to ``file.process.workers``, or OCR_WORKERS if unset.
+        """
+        workers = workers or self.config.get('file.process.workers', 0) or OCR_WORKERS
+        if pages is None:
+            with open_pdf(file_path) as pdf:
+                pages = range(1, len(pdf) + 1)
+        executor = None
+        if len(pages) > 1:
+            # tesserocr releases the GIL while recognizing, so threads suffice
+            pool = ThreadPoolExecutor if _tesserocr() else ProcessPoolExecutor
+            executor = pool(max_workers=min(len(pages), workers))
+        try:
+            ocr = executor.map if executor else map
+            texts = []
+            # Text by page hash, so repeated pages (blank separators, form
+            # templates) are looked up and OCR'd once per document
+            seen: Dict[bytes, str] = {}
+            for image_paths in self._iter_pdf_pages(file_path, pages):
+                keys = [_ocr_cache_key(path, b'pdf-page') for path in image_paths]
+                misses = {}
+                for key, path in zip(keys, image_paths):
+                    if key in seen or key in misses:
+                        continue
+                    text = self.ocr_cache.get(key)
+                    if text is None:
+                        misses[key] = path
+                    else:
+                        seen[key] = text
+                for key, text in zip(misses, ocr(_ocr_image_file, misses.values())):
+                    seen[key] = text
+                    self.ocr_cache.put(key, text)
+                texts.extend(seen[key] for key in keys)
+            return texts
+        finally:
+            if executor:
+                executor.shutdown()
+
+    def _iter_pdf_pages(self, file_path: str, pages: Sequence[int],
+                        chunk_size: int = OCR_CHUNK_SIZE) -> Iterator[List[str]]:
+        """Rasterize PDF pages chunk by chunk, yielding the image paths of each chunk.
+
+        Pages are rendered in-process with PDFium and written as grayscale
+        JPEGs to a temporary directory; they are removed once the consumer
+        moves on to the next chunk. PDFium is not thread-safe, so rendering
+        stays on the calling thread, holding PDFIUM_LOCK per chunk; never
+        across a yield, so other threads' PDFs proceed while a chunk is OCR'd.
+        """
+        import pypdfium2 as pdfium
+
+        with PDFIUM_LOCK:
+            pdf = pdfium.PdfDocument(file_path)
+        try:
+            with tempfile.TemporaryDirectory() as output_folder:
+                for start in range(0, len(pages), chunk_size):
+                    image_paths = []
+                    with PDFIUM_LOCK:
+                        for page_number in pages[start:start + chunk_size]:
+                            page = pdf[page_number - 1]
+                            try:
+                                bitmap = page.render(scale=OCR_RENDER_DPI / 72, grayscale=True)
+                                image_path = os.path.join(output_folder, f"page-{page_number}.jpg")
+                                bitmap.to_pil().save(image_path)
+                                # Closed here, not by the garbage collector
+                                # on whichever thread, outside the lock
+                                bitmap.close()
+                            finally:
+                                page.close()
+                            image_paths.append(image_path)
+                    yield image_paths
+                    for image_path in image_paths:
+                        os.unlink(image_path)
+        finally:
+            with PDFIUM_LOCK:
+                pdf.close()
+
     def _extract_entities(self, metadata: Dict[str, Any]) -> Dict[str, Any]:
         """Extract entities from text using traditional methods."""
         text = metadata["content"]["text"]
@@ -306,33 +515,19 @@ class FileProcessorService:
             return metadata
 
         # Extract dates using regex
-        date_patterns = [
-            r'\d{4}-\d{2}-\d{2}',  # YYYY-MM-DD
-            r'\d{2}\.\d{2}\.\d{4}',  # DD.MM.YYYY
-            r'\d{2}/\d{2}/\d{4}'   # DD/MM/YYYY
-        ]
-        
-        for pattern in date_patterns:
-            metadata["content"]["entities"]["dates"].extend(
-                [match.group() for match in re.finditer(pattern, text)]
-            )
+        for pattern in DATE_PATTERNS:
+            metadata["content"]["entities"]["dates"].extend(pattern.findall(text))
 
         # Extract amounts using regex
-        amount_patterns = [
-            r'\$\s*\d+(?:,\d{3})*(?:\.\d{2})?',  # USD
-            r'€\s*\d+(?:,\d{3})*(?:\.\d{2})?',   # EUR
-            r'\d+(?:,\d{3})*(?:\.\d{2})?\s*(?:EUR|USD|€|\$)'  # Amount followed by currency
-        ]
-        
-        for pattern in amount_patterns:
-            metadata["content"]["entities"]["amounts"].extend(
-                [match.group() for match in re.finditer(pattern, text)]
-            )
+        for pattern in AMOUNT_PATTERNS:
+            metadata["content"]["entities"]["amounts"].extend(pattern.findall(text))
 
         return metadata
 
     def _detect_language(self, text: str) -> str:
         """Detect text language."""
+        import langdetect
+
         try:
             return langdetect.detect(text)
         except:
@@ -342,9 +537,14 @@ class FileProcessorService:
         """Save metadata to a file."""
         output_path = f"{file_path}.filing_meta_data"
         try:
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(metadata, f, indent=4, ensure_ascii=False)
+            # EXIF data uses int keys and may hold non-JSON values
+            with open(output_path, 'wb') as f:
+                f.write(orjson.dumps(
+                    metadata,
+                    default=str,
+                    option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+                ))
             return True
         except Exception as e:
-            print(f"Error saving metadata: {str(e)}")
+            logger.error(f"Error saving metadata: {str(e)}")
             return False
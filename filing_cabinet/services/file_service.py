@@ -1,17 +1,55 @@
 """File service for the filing cabinet."""
-from typing import List, Optional, Dict, Any
+from typing import Callable, List, Optional, Dict, Any, Iterable, Iterator, Tuple, TypeVar
+import collections
+import functools
 import os
 import shutil
-import json
+import orjson
 import logging
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
 from ..models.file import File
 from ..repositories.file_repository import FileRepository
 from ..config import get_config
+from ..utils.file_utils import stat_signature, walk_files
 from .document_processor import DocumentProcessor
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
+# Files looked up in the stat cache, written and committed per batch while
+# indexing; large enough to amortize the commit, small enough to bound the
+# WAL, the cache entries held and what an interrupted run loses
+INDEX_BATCH_SIZE = 5000
+# PDFs from which process_many extracts them in worker processes; each
+# takes a few hundred milliseconds to spawn, so smaller batches stay on threads
+PROCESS_POOL_MIN_PDFS = 16
+
+# Path fragments that exclude a file from indexing and adding
+IGNORE_PATTERNS = (
+    '.git', '__pycache__', '.pytest_cache', '.DS_Store', '*.pyc', '*.pyo',
+    '*.pyd', '.Python', 'build', 'develop-eggs', 'dist', 'downloads', 'eggs',
+    '.eggs', 'lib', 'lib64', 'parts', 'sdist', 'var', 'wheels', '*.egg-info',
+    '.installed.cfg', '*.egg', '.env', '.venv', 'env', 'venv', 'ENV', '.idea',
+    '.vscode',
+)
+
+T = TypeVar('T')
+R = TypeVar('R')
+
+def _map_ahead(executor: Executor, fn: Callable[[T], R], items: Iterable[T], window: int) -> Iterator[R]:
+    """Like ``executor.map``, but with at most ``window`` calls in flight.
+    
+    ``executor.map`` submits every item up front; this keeps the pool busy
+    while holding only a window of futures (and results) at a time.
+    """
+    pending: 'collections.deque[Future[R]]' = collections.deque()
+    for item in items:
+        if len(pending) >= window:
+            yield pending.popleft().result()
+        pending.append(executor.submit(fn, item))
+    while pending:
+        yield pending.popleft().result()
+
 class FileService:
     """Service for managing files."""
     
@@ -19,77 +57,220 @@ class FileService:
         """Initialize FileService with database path."""
         self.file_repo = FileRepository(db_path)
         self.config = get_config(db_path)
+        self.hash_algorithm = self.config.get('file.hash.algorithm', 'sha256')
         self.processor = DocumentProcessor(self.config)
         logger.debug("FileService initialized")
         
     def __del__(self):
         """Clean up database connections."""
+        self.close()
+    
+    def close(self) -> None:
+        """Close the database connections."""
         if hasattr(self, 'file_repo'):
             self.file_repo.close()
             
-    def add_file(self, path: str) -> Dict[str, Any]:
-        """Add a file or directory to the filing cabinet."""
-        processed = 0
+    def add_file(self, path: str, workers: Optional[int] = None) -> Dict[str, Any]:
+        """Add a file or directory to the filing cabinet.
+        
+        ``workers`` overrides the ``file.process.workers`` setting for the
+        number of files processed concurrently.
+        """
+        paths = []
         skipped = 0
         
         if os.path.isfile(path):
             if not self.should_ignore(path):
-                self.process_file(path)
-                processed += 1
+                paths.append(path)
             else:
                 skipped += 1
         elif os.path.isdir(path):
-            for root, _, files in os.walk(path):
-                for file in files:
-                    file_path = os.path.join(root, file)
-                    if not self.should_ignore(file_path):
-                        self.process_file(file_path)
-                        processed += 1
-                    else:
-                        skipped += 1
+            for entry in walk_files(path):
+                if self._is_indexable(entry):
+                    paths.append(entry.path)
+                else:
+                    skipped += 1
+        
+        if len(paths) > 1:
+            import asyncio
+            if workers is None:
+                workers = self.config.get('file.process.workers', 0)
+            asyncio.run(self.process_many(paths, max_concurrency=workers or None))
+        else:
+            for file_path in paths:
+                self.process_file(file_path)
                         
         return {
-            "processed": processed,
+            "processed": len(paths),
             "skipped": skipped
         }
             
-    def process_file(self, file_path: str, extract_content: bool = False) -> Dict[str, Any]:
-        """Process a file and store its metadata."""
+    def process_file(self, file_path: str, extract_content: bool = False,
+                     sidecar: bool = False) -> Dict[str, Any]:
+        """Process a file and store its metadata.
+        
+        Results are stored in the database; with ``sidecar`` they are also
+        written next to the file as ``<file>.filing_meta_data``.
+        """
+        file, result = self._process(file_path)
+        self._store(file, result, sidecar)
+        return result
+        
+    async def process_many(self, paths: Iterable[str], sidecar: bool = False,
+                           max_concurrency: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Process several files concurrently, returning results in order.
+        
+        Hashing and extraction run on a thread pool, at most
+        ``max_concurrency`` (default: CPU count) at a time, while the
+        database writes stay on the event loop's thread. PDFium is not
+        thread-safe, so a process extracts one PDF at a time: from
+        PROCESS_POOL_MIN_PDFS PDFs on, their extraction goes to
+        DocumentProcessor.process_many's worker processes instead, and
+        only their hashing stays on the threads.
+        """
+        import asyncio
+        
+        paths = list(paths)
+        loop = asyncio.get_running_loop()
+        concurrency = max_concurrency or os.cpu_count() or 1
+        semaphore = asyncio.Semaphore(concurrency)
+        pdf_paths = [path for path in paths if path.lower().endswith('.pdf')]
+        if concurrency < 2 or len(pdf_paths) < PROCESS_POOL_MIN_PDFS:
+            pdf_paths = []
+        pdf_index = {path: index for index, path in enumerate(pdf_paths)}
+        
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            if pdf_paths:
+                # Runs alongside, on the loop's default executor, so it
+                # doesn't hold one of the hashing threads
+                pdf_results = loop.run_in_executor(
+                    None, self.processor.process_many, pdf_paths, concurrency
+                )
+            
+            async def process(file_path: str) -> Dict[str, Any]:
+                async with semaphore:
+                    if file_path in pdf_index:
+                        file = await loop.run_in_executor(executor, self._file, file_path)
+                    else:
+                        file, result = await loop.run_in_executor(
+                            executor, self._process, file_path
+                        )
+                if file_path in pdf_index:
+                    result = (await pdf_results)[pdf_index[file_path]]
+                self._store(file, result, sidecar)
+                return result
+            
+            return await asyncio.gather(*(process(path) for path in paths))
+        
+    def _process(self, file_path: str) -> Tuple[File, Dict[str, Any]]:
+        """Hash and extract a file without touching the database."""
+        file = self._file(file_path)
+        return file, self.processor.process(file_path)
+    
+    def _file(self, file_path: str) -> File:
+        """Hash a file without touching the database."""
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"File not found: {file_path}")
-            
-        file = File(file_path)
-        self.file_repo.save(file)
         
-        # Process the file and extract information
-        result = self.processor.process(file_path)
+        return File(file_path, self.hash_algorithm)
         
-        # Create the metadata file for testing/development
-        meta_file_path = f"{file_path}.filing_meta_data"
-        with open(meta_file_path, 'w') as f:
-            json.dump(result, f, indent=4)
-            
-        return result
+    def _store(self, file: File, result: Dict[str, Any], sidecar: bool) -> None:
+        """Save a processed file and its results."""
+        # Row and metadata go in together, with a single commit
+        with self.file_repo.transaction():
+            self.file_repo.save(file)
+            self.save_metadata(file.checksum, result, file.mime_type)
         
-    def index_files(self, directory: str) -> Dict[str, Any]:
-        """Index files in a directory."""
-        processed = 0
+        if sidecar:
+            meta_file_path = f"{file.path}.filing_meta_data"
+            with open(meta_file_path, 'wb') as f:
+                f.write(orjson.dumps(
+                    result,
+                    default=str,
+                    option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+                ))
+        
+    def save_metadata(self, checksum: str, metadata: Dict[str, Any],
+                      mime_type: Optional[str] = None) -> None:
+        """Store processing results for a file, keyed by its checksum."""
+        content = metadata.get("content")
+        text = content.get("text") if isinstance(content, dict) else None
+        self.file_repo.save_metadata(
+            checksum,
+            mime_type,
+            text,
+            orjson.dumps(metadata, default=str, option=orjson.OPT_NON_STR_KEYS)
+        )
+        
+    def get_metadata(self, checksum: str) -> Optional[Dict[str, Any]]:
+        """Get stored processing results for a checksum."""
+        metadata = self.file_repo.get_metadata(checksum)
+        if metadata is None:
+            return None
+        return orjson.loads(metadata)
+        
+    def index_files(self, directory: str, workers: Optional[int] = None) -> Dict[str, Any]:
+        """Index files in a directory.
+        
+        ``workers`` overrides the ``indexing.workers`` setting for the number
+        of threads hashing files.
+        """
+        paths = []
         skipped = 0
+        follow_symlinks = bool(self.config.get('indexing.follow_symlinks', False))
         
-        for root, _, files in os.walk(directory):
-            for file in files:
-                file_path = os.path.join(root, file)
-                if not self.should_ignore(file_path):
-                    self.file_repo.index_file(file_path)
-                    processed += 1
-                else:
-                    skipped += 1
+        for entry in walk_files(directory, follow_symlinks):
+            if self._is_indexable(entry):
+                paths.append(entry.path)
+            else:
+                skipped += 1
+        
+        # Hash files on a thread pool (hashlib releases the GIL) while
+        # this thread does all the database writes
+        if workers is None:
+            workers = self.config.get('indexing.workers', 8)
+        workers = max(int(workers), 1)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for start in range(0, len(paths), INDEX_BATCH_SIZE):
+                batch_paths = paths[start:start + INDEX_BATCH_SIZE]
+                # Checksums known for this batch only, rather than the whole cache
+                known = self.file_repo.get_stat_cache(
+                    self.hash_algorithm, (os.path.abspath(path) for path in batch_paths)
+                )
+                index_file = functools.partial(self._index_file, known=known)
+                self._save_index_batch(list(
+                    _map_ahead(executor, index_file, batch_paths, workers * 4)
+                ))
                     
         return {
-            "processed": processed,
+            "processed": len(paths),
             "skipped": skipped
         }
         
+    def _index_file(self, file_path: str, known: Dict[str, Tuple[Tuple[int, int, int, int], str]]
+                    ) -> Tuple[File, Optional[Tuple[int, int, int, int]]]:
+        """Build the File for an indexed path, hashing it only if it changed.
+        
+        Returns the file and, when it was hashed, the stat signature to
+        remember its checksum by.
+        """
+        st = os.stat(file_path)
+        # Taken before hashing, so a write during the hash shows up next time
+        signature = stat_signature(st)
+        cached = known.get(os.path.abspath(file_path))
+        if cached is not None and cached[0] == signature:
+            return File(file_path, self.hash_algorithm, checksum=cached[1], stat_result=st), None
+        return File(file_path, self.hash_algorithm, stat_result=st), signature
+        
+    def _save_index_batch(self, batch: List[Tuple[File, Optional[Tuple[int, int, int, int]]]]) -> None:
+        """Save indexed files and the stat data of the ones just hashed."""
+        with self.file_repo.transaction():
+            self.file_repo.save_many(file for file, _ in batch)
+            self.file_repo.save_stat_cache(self.hash_algorithm, [
+                (file.path, signature, file.checksum)
+                for file, signature in batch if signature is not None
+            ])
+        
     def export_file(self, checksum: str, output_path: Optional[str] = None) -> str:
         """Export a file to the filesystem."""
         file = self.file_repo.get_by_checksum(checksum)
@@ -108,10 +289,11 @@ class FileService:
         
     def analyze(self, file_path: str) -> Dict[str, Any]:
         """Analyze a file using AI to extract insights and metadata."""
-        file = File(file_path)
+        file = File(file_path, self.hash_algorithm)
         
-        # First ensure the file is in our system
-        self.file_repo.index_file(file_path)
+        # First ensure the file is in our system, reusing the record above
+        # rather than hashing the file a second time
+        self.file_repo.save(file)
         
         # Here we would normally do AI analysis
         # For now, just return basic file info
@@ -135,8 +317,7 @@ class FileService:
         
     def search(self, query: str) -> List[Dict[str, Any]]:
         """Search for files in the filing cabinet."""
-        files = self.file_repo.search(query)
-        return [file.to_dict() for file in files]
+        return [file.to_dict() for file in self.file_repo.iter_search(query)]
         
     def get_statistics(self) -> Dict[str, Any]:
         """Get statistics about the filing cabinet."""
@@ -147,43 +328,24 @@ class FileService:
             "database_path": self.file_repo.db_path
         }
         
+    def _is_indexable(self, entry: os.DirEntry) -> bool:
+        """Check whether a walked entry is a regular file that isn't ignored.
+        
+        The type check uses the directory listing's file type, so only
+        symlinks cost a stat; sockets, FIFOs and broken links are skipped
+        instead of failing (or blocking) when opened for hashing.
+        """
+        try:
+            if not entry.is_file():
+                return False
+        except OSError:
+            return False
+        return not self.should_ignore(entry.path)
+        
     @staticmethod
     def should_ignore(file_path: str) -> bool:
         """Check if file should be ignored based on patterns."""
-        ignore_patterns = [
-            '.git',
-            '__pycache__',
-            '.pytest_cache',
-            '.DS_Store',
-            '*.pyc',
-            '*.pyo',
-            '*.pyd',
-            '.Python',
-            'build',
-            'develop-eggs',
-            'dist',
-            'downloads',
-            'eggs',
-            '.eggs',
-            'lib',
-            'lib64',
-            'parts',
-            'sdist',
-            'var',
-            'wheels',
-            '*.egg-info',
-            '.installed.cfg',
-            '*.egg',
-            '.env',
-            '.venv',
-            'env',
-            'venv',
-            'ENV',
-            '.idea',
-            '.vscode'
-        ]
-        
-        for pattern in ignore_patterns:
+        for pattern in IGNORE_PATTERNS:
             if pattern in file_path:
                 return True
         return False
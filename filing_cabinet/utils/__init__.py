@@ -1,11 +1,17 @@
 """Utility modules for Filing Cabinet."""
 from .logging import logger, setup_logging
-from .file_utils import get_device_identifier, get_file_type, get_absolute_path
+from .file_utils import (
+    get_device_identifier, get_file_type, get_mime_type,
+    calculate_checksum, get_absolute_path, walk_files
+)
 
 __all__ = [
     'logger', 
     'setup_logging',
     'get_device_identifier',
     'get_file_type',
-    'get_absolute_path'
+    'get_mime_type',
+    'calculate_checksum',
+    'get_absolute_path',
+    'walk_files'
 ]
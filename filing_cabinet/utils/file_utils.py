@@ -1,12 +1,25 @@
 """File-related utility functions."""
+import functools
+import mimetypes
 import os
-import platform
-import uuid
+import threading
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Iterator, Optional, Tuple
 
+# libmagic handles are not thread-safe, so each thread gets its own
+_magic = threading.local()
+
+@functools.lru_cache(maxsize=1)
 def get_device_identifier() -> str:
-    """Get a unique identifier for the current device."""
+    """Get a unique identifier for the current device.
+    
+    Computed once per process, so the random fallback stays the same
+    for the whole session.
+    """
+    # Imported here: this module is on every command's startup path
+    import platform
+    import uuid
+    
     # Try to get a stable machine ID
     try:
         if platform.system() == 'Darwin':
@@ -23,6 +36,43 @@ def get_device_identifier() -> str:
     # Fallback to a random UUID that persists for this session
     return str(uuid.uuid4())
 
+def walk_files(top: str, follow_symlinks: bool = False) -> Iterator[os.DirEntry]:
+    """
+    Yield the non-directory entries below ``top``.
+    
+    Uses os.scandir directly so callers get DirEntry objects, whose type
+    and path come from the directory listing without further stat calls.
+    Symlinks are yielded like files and never stat'ed here, unless
+    ``follow_symlinks`` is set: then symlinked directories are descended
+    into, each real directory at most once.
+    """
+    stack = [top]
+    seen = set()
+    if follow_symlinks:
+        top_stat = os.stat(top)
+        seen.add((top_stat.st_dev, top_stat.st_ino))
+    while stack:
+        try:
+            scandir_it = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with scandir_it:
+            for entry in scandir_it:
+                try:
+                    if not follow_symlinks:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                            continue
+                    elif entry.is_dir():
+                        target = entry.stat()
+                        if (target.st_dev, target.st_ino) not in seen:
+                            seen.add((target.st_dev, target.st_ino))
+                            stack.append(entry.path)
+                        continue
+                except OSError:
+                    pass
+                yield entry
+
 def get_file_type(file_path: str) -> Tuple[str, Optional[str]]:
     """
     Get the type of file based on extension and content.
@@ -48,6 +98,86 @@ def get_file_type(file_path: str) -> Tuple[str, Optional[str]]:
     _, ext = os.path.splitext(file_path)
     return ext.lower() if ext else '', None
 
+def get_mime_type(file_path: str) -> str:
+    """Get the MIME type of a file.
+    
+    Known extensions are resolved without touching the file; anything else
+    is sniffed with this thread's libmagic handle.
+    """
+    mime_type, encoding = mimetypes.guess_type(file_path)
+    if mime_type and not encoding:
+        return mime_type
+    mime = getattr(_magic, 'mime', None)
+    if mime is None:
+        import magic
+        mime = _magic.mime = magic.Magic(mime=True)
+    return mime.from_file(file_path)
+
+# Files at least this large are hashed through a memory map
+MMAP_MIN_SIZE = 1024 * 1024
+# ...and files this large or more by reading, so a huge file's mapped pages
+# don't all count against the process's resident memory
+MMAP_MAX_SIZE = 256 * 1024 * 1024
+
+def calculate_checksum(file_path: str, algorithm: str = 'sha256') -> str:
+    """
+    Calculate the hex checksum of a file's contents.
+    
+    Args:
+        file_path: File to hash
+        algorithm: Any hashlib algorithm name, or 'blake3' when the optional
+            blake3 package is installed (multi-threaded, memory-mapped)
+    """
+    if algorithm == 'blake3':
+        from blake3 import blake3
+        hasher = blake3(max_threads=blake3.AUTO)
+        hasher.update_mmap(file_path)
+        return hasher.hexdigest()
+    
+    import hashlib
+    
+    with open(file_path, "rb", buffering=0) as f:
+        if MMAP_MIN_SIZE <= os.fstat(f.fileno()).st_size < MMAP_MAX_SIZE:
+            import mmap
+            # Hash straight from the page cache instead of copying the file
+            # through a read buffer; update() releases the GIL meanwhile
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                if hasattr(mmap, 'MADV_SEQUENTIAL'):
+                    # Let the kernel read ahead aggressively
+                    mapped.madvise(mmap.MADV_SEQUENTIAL)
+                hasher = hashlib.new(algorithm)
+                hasher.update(mapped)
+                return hasher.hexdigest()
+        if hasattr(hashlib, 'file_digest'):
+            # Python 3.11+: reads and hashes in C with the GIL released
+            return hashlib.file_digest(f, algorithm).hexdigest()
+        hasher = hashlib.new(algorithm)
+        for byte_block in iter(lambda: f.read(1024 * 1024), b""):
+            hasher.update(byte_block)
+        return hasher.hexdigest()
+
+def stat_signature(st: os.stat_result) -> Tuple[int, int, int, int]:
+    """A file's (device, inode, mtime_ns, size), which change whenever its content may have."""
+    return (st.st_dev, st.st_ino, st.st_mtime_ns, st.st_size)
+
+@functools.lru_cache(maxsize=4096)
+def _checksum_for(file_path: str, algorithm: str, signature: Tuple[int, int, int, int]) -> str:
+    """calculate_checksum, memoized per file signature."""
+    return calculate_checksum(file_path, algorithm)
+
+def cached_checksum(file_path: str, algorithm: str = 'sha256',
+                    stat_result: Optional[os.stat_result] = None) -> str:
+    """
+    Like calculate_checksum, but reuses the checksum computed earlier in
+    this process while the file's device, inode, mtime and size are unchanged.
+    
+    Args:
+        file_path: File to hash
+        algorithm: As for calculate_checksum
+        stat_result: The file's os.stat result, if the caller already has it
+    """
+    return _checksum_for(file_path, algorithm, stat_signature(stat_result or os.stat(file_path)))
+
 def get_absolute_path(path: str) -> str:
     """Convert path to absolute path, resolving any symlinks."""
     return str(Path(path).resolve())
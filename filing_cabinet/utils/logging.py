@@ -1,8 +1,10 @@
 """Logging configuration for Filing Cabinet."""
+import atexit
 import logging
 import os
+import queue
 import sys
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from typing import Optional
 
 # Default log format
@@ -18,6 +20,9 @@ def setup_logging(
     """
     Setup logging configuration for the application.
     
+    Records are handed to a background listener thread through a queue, so
+    worker threads never block on (or interleave) writes to the outputs.
+    
     Args:
         log_file: Path to log file. If None, logs to stderr
         level: Logging level
@@ -37,7 +42,7 @@ def setup_logging(
     # Always add console handler
     console_handler = logging.StreamHandler(sys.stderr)
     console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
+    handlers = [console_handler]
     
     # Add file handler if log_file specified
     if log_file:
@@ -52,7 +57,13 @@ def setup_logging(
             backupCount=backup_count
         )
         file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
+        handlers.append(file_handler)
+    
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    logger.addHandler(QueueHandler(log_queue))
     
     return logger
 
@@ -0,0 +1,32 @@
+"""PDFium helpers.
+
+PDFium is not thread-safe, and documents are processed on thread pools, so
+every call into it in this process, from any thread, is made while holding
+PDFIUM_LOCK. Worker processes have their own PDFium; the lock only keeps
+threads of one process apart.
+"""
+import threading
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Iterator
+
+if TYPE_CHECKING:
+    import pypdfium2
+
+# Reentrant, so helpers taking it may be called with it held
+PDFIUM_LOCK = threading.RLock()
+
+@contextmanager
+def open_pdf(file_path: str) -> Iterator['pypdfium2.PdfDocument']:
+    """Open a PDF with PDFium, holding PDFIUM_LOCK until it is closed again.
+
+    Keep the block short: other threads' PDFs wait for it. Work that
+    doesn't touch PDFium (OCR, worker pools) belongs after the block.
+    """
+    import pypdfium2 as pdfium
+
+    with PDFIUM_LOCK:
+        pdf = pdfium.PdfDocument(file_path)
+        try:
+            yield pdf
+        finally:
+            pdf.close()
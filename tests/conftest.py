@@ -0,0 +1,87 @@
+"""Fixtures shared by the test modules."""
+import tempfile
+import threading
+import time
+import pytest
+import pypdfium2
+
+@pytest.fixture
+def temp_dir():
+    """Temporary directory."""
+    with tempfile.TemporaryDirectory() as path:
+        yield path
+
+class FakePdfium:
+    """Stand-in for pypdfium2's documents that records overlapping calls.
+
+    Every call lingers briefly, so two threads calling at once are caught
+    in ``max_active``.
+    """
+
+    PAGES = 3
+
+    def __init__(self):
+        self.active = 0
+        self.max_active = 0
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def call(self, result=None):
+        """Record one call into PDFium, returning ``result``."""
+        with self._lock:
+            self.active += 1
+            self.calls += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(0.001)
+        with self._lock:
+            self.active -= 1
+        return result
+
+    def document(self, file_path):
+        """Open a fake document; patched in for pypdfium2.PdfDocument."""
+        fake = self
+
+        class Closeable:
+            def close(self):
+                fake.call()
+
+        class Bitmap(Closeable):
+            def to_pil(self):
+                return fake.call(self)
+
+            def save(self, path):
+                with open(path, 'wb') as f:
+                    f.write(fake.call(b'image'))
+
+        class TextPage(Closeable):
+            def get_text_range(self):
+                return fake.call('page text')
+
+        class Page(Closeable):
+            def get_textpage(self):
+                return fake.call(TextPage())
+
+            def render(self, **kwargs):
+                return fake.call(Bitmap())
+
+        class Document(Closeable):
+            def __len__(self):
+                return fake.call(fake.PAGES)
+
+            def __getitem__(self, index):
+                return fake.call(Page())
+
+            def __iter__(self):
+                return (self[index] for index in range(len(self)))
+
+            def get_metadata_dict(self, skip_empty=False):
+                return fake.call({'Title': 'fake'})
+
+        return self.call(Document())
+
+@pytest.fixture
+def fake_pdfium(monkeypatch):
+    """FakePdfium patched in for pypdfium2.PdfDocument."""
+    fake = FakePdfium()
+    monkeypatch.setattr(pypdfium2, 'PdfDocument', fake.document)
+    return fake
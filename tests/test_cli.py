@@ -0,0 +1,77 @@
+"""Tests for the command-line interface."""
+import hashlib
+import json
+import os
+import pytest
+from click.testing import CliRunner
+from filing_cabinet import cli as cli_module
+from filing_cabinet.cli import cli
+
+@pytest.fixture
+def runner(temp_dir, monkeypatch):
+    """CliRunner using a database in the temporary directory."""
+    monkeypatch.setattr(cli_module, 'DB_PATH', os.path.join(temp_dir, 'filing.cabinet'))
+    cli_module.init_config.cache_clear()
+    yield CliRunner()
+    cli_module.init_config().close()
+    cli_module.init_config.cache_clear()
+
+def test_info_json(runner, temp_dir):
+    """Test that info --json prints the file's record as JSON."""
+    docs_dir = os.path.join(temp_dir, 'docs')
+    os.mkdir(docs_dir)
+    path = os.path.join(docs_dir, 'note.txt')
+    with open(path, 'w') as f:
+        f.write('hello')
+    assert runner.invoke(cli, ['index', docs_dir]).exit_code == 0
+
+    result = runner.invoke(cli, ['info', '1', '--json'])
+
+    assert result.exit_code == 0
+    assert json.loads(result.output) == {
+        'path': path,
+        'name': 'note.txt',
+        'size': 5,
+        'checksum': hashlib.sha256(b'hello').hexdigest(),
+        'mime_type': 'text/plain'
+    }
+
+def test_config_list_json(runner):
+    """Test that config list --json prints every entry as JSON, with the API key masked."""
+    runner.invoke(cli, ['config', 'set-openai-key', 'sk-abcdefgh12345678'])
+
+    result = runner.invoke(cli, ['config', 'list', '--json'])
+
+    assert result.exit_code == 0
+    configs = json.loads(result.output)
+    assert list(configs) == sorted(configs)
+    assert configs['file.hash.algorithm'] == {
+        'value': 'sha256',
+        'default': 'sha256',
+        'description': configs['file.hash.algorithm']['description']
+    }
+    assert configs['file.index.extensions']['value'] == ['.txt', '.pdf', '.doc', '.docx']
+    assert configs['openai.api_key']['value'] == 'sk-abcde...5678'
+
+def test_config_set_stores_text_unless_json(runner):
+    """Test that config set stores values as typed, parsing them only with --json."""
+    assert runner.invoke(cli, ['config', 'set', 'cabinet.name', '2024']).exit_code == 0
+    assert cli_module.init_config().get('cabinet.name') == '2024'
+
+    assert runner.invoke(cli, ['config', 'set', 'file.process.workers', '4', '--json']).exit_code == 0
+    assert cli_module.init_config().get('file.process.workers') == 4
+
+    result = runner.invoke(cli, ['config', 'set', 'file.process.workers', 'four', '--json'])
+    assert result.exit_code == 1
+    assert cli_module.init_config().get('file.process.workers') == 4
+
+def test_config_create_json(runner):
+    """Test that config create parses the value and default only with --json."""
+    runner.invoke(cli, ['config', 'create', 'test.text', 'true', '--default', '1'])
+    runner.invoke(cli, ['config', 'create', 'test.json', 'true', '--default', '1', '--json'])
+
+    configs = json.loads(runner.invoke(cli, ['config', 'list', '--json']).output)
+    assert configs['test.text']['value'] == 'true'
+    assert configs['test.text']['default'] == '1'
+    assert configs['test.json']['value'] is True
+    assert configs['test.json']['default'] == 1
@@ -3,6 +3,7 @@ import os
 import tempfile
 import pytest
 import json
+import sqlite3
 from filing_cabinet.config.config_service import ConfigService, ConfigurationError
 
 @pytest.fixture
@@ -108,3 +109,65 @@ def test_error_handling(config_service):
     
     # Test getting non-existent key without default
     assert config_service.get('non.existent') is None
+
+def test_singleton_per_path():
+    """Test that each database gets its own instance, and opening one leaves the others open."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        service1 = ConfigService(os.path.join(temp_dir, 'first.db'))
+        service2 = ConfigService(os.path.join(temp_dir, 'second.db'))
+        
+        assert service2 is not service1
+        assert service1.is_initialized
+        assert service2.is_initialized
+        assert ConfigService(os.path.join(temp_dir, 'first.db')) is service1
+        assert ConfigService(os.path.join(temp_dir, 'second.db')) is service2
+        
+        service1.close()
+        reopened = ConfigService(os.path.join(temp_dir, 'first.db'))
+        assert reopened is not service1
+        assert reopened.is_initialized
+        reopened.close()
+        service2.close()
+
+def test_migrate_untagged_database(temp_db):
+    """Test opening a config database from before values were tagged as JSON."""
+    conn = sqlite3.connect(temp_db)
+    conn.execute('''
+    CREATE TABLE config (
+        key TEXT PRIMARY KEY,
+        value TEXT NOT NULL,
+        default_value TEXT,
+        description TEXT
+    )
+    ''')
+    conn.executemany('INSERT INTO config VALUES (?, ?, ?, ?)', [
+        ('cabinet.name', 'My Cabinet', 'Filing Cabinet', 'Name'),
+        ('file.process.workers', '4', '0', 'Workers'),
+        ('file.index.extensions', '[".txt", ".pdf"]', '[".txt"]', 'Extensions'),
+        ('test.flag', 'true', None, 'Flag'),
+    ])
+    conn.commit()
+    conn.close()
+    
+    service = ConfigService(temp_db)
+    # Values read as they did before: JSON where it parses, text otherwise
+    assert service.get('cabinet.name') == 'My Cabinet'
+    assert service.get('file.process.workers') == 4
+    assert service.get('file.index.extensions') == ['.txt', '.pdf']
+    assert service.get('test.flag') is True
+    configs = service.list_all()
+    assert configs['cabinet.name']['default'] == 'Filing Cabinet'
+    assert configs['file.process.workers']['default'] == 0
+    assert configs['test.flag']['default'] is None
+    
+    service.set('cabinet.name', '42')
+    service.set('file.process.workers', 8)
+    service.reset('file.index.extensions')
+    service.close()
+    
+    # Round-trip through a fresh connection
+    service = ConfigService(temp_db)
+    assert service.get('cabinet.name') == '42'
+    assert service.get('file.process.workers') == 8
+    assert service.get('file.index.extensions') == ['.txt']
+    service.close()
@@ -0,0 +1,103 @@
+"""Tests for DocumentProcessor."""
+import os
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from filing_cabinet.config.config_service import ConfigService
+from filing_cabinet.services.document_processor import DocumentProcessor
+from filing_cabinet.services.file_processor_service import FileProcessorService
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+@pytest.fixture
+def processor(temp_dir):
+    """DocumentProcessor with its own configuration database."""
+    config = ConfigService(os.path.join(temp_dir, 'test.db'))
+    yield DocumentProcessor(config)
+    config.close()
+
+@pytest.fixture
+def pdf_paths(temp_dir):
+    """A few distinct files named as PDFs, for a faked PDFium to open."""
+    paths = []
+    for i in range(6):
+        path = os.path.join(temp_dir, f'doc-{i}.pdf')
+        with open(path, 'w') as f:
+            f.write(f'document {i}')
+        paths.append(path)
+    return paths
+
+def _content(result):
+    """The parts of a result that depend only on the document."""
+    return result['content'], result['pdf_metadata'], result['filing_cabinet']['checksum']
+
+def test_process_pdf(processor):
+    """Test extracting text and metadata from a PDF."""
+    result = processor.process(os.path.join(FIXTURES, 'git_hub_receipt.pdf'))
+    assert result['processing']['method'] == 'traditional'
+    assert result['content']['text']
+    assert not result['content']['text'].startswith('Failed')
+
+def test_pdfium_calls_never_overlap(processor, temp_dir, pdf_paths, fake_pdfium):
+    """Test that PDFs processed and rendered on several threads use PDFium one call at a time."""
+    file_processor = FileProcessorService(os.path.join(temp_dir, 'test.db'))
+
+    def render(path):
+        return [len(chunk) for chunk in file_processor._iter_pdf_pages(path, [1, 2, 3], chunk_size=2)]
+
+    # Both services' work is queued before any is collected, so it interleaves
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        processed = [executor.submit(processor.process, path) for path in pdf_paths]
+        rendered = [executor.submit(render, path) for path in pdf_paths]
+        results = [future.result() for future in processed]
+        chunks = [future.result() for future in rendered]
+    file_processor.ocr_cache.close()
+
+    assert fake_pdfium.calls > 0
+    assert fake_pdfium.max_active == 1
+    assert [result['content']['text'] for result in results] == ['page text\npage text\npage text'] * 6
+    assert chunks == [[2, 1]] * 6
+
+def test_process_pdf_pages_in_worker_processes(processor, monkeypatch):
+    """Test that extracting page ranges in worker processes matches sequential extraction."""
+    path = os.path.join(FIXTURES, 'Kontoauszug_20190801.pdf')
+    expected = _content(processor.process(path))
+
+    monkeypatch.setattr('filing_cabinet.services.document_processor.PDF_PARALLEL_MIN_PAGES', 2)
+    processor.config.set('file.process.workers', 3)
+    assert _content(DocumentProcessor(processor.config).process(path)) == expected
+
+def test_process_many_in_worker_processes(processor):
+    """Test that documents processed in worker processes match processing each here, in order."""
+    paths = [os.path.join(FIXTURES, name) for name in sorted(os.listdir(FIXTURES))]
+    expected = [_content(processor.process(path)) for path in paths]
+
+    assert [_content(result) for result in processor.process_many(paths, workers=2)] == expected
+
+def test_cached_result_gets_fresh_processing_time(processor, monkeypatch):
+    """Test that reprocessing an unchanged file reuses its content but not its times."""
+    path = os.path.join(FIXTURES, 'git_hub_receipt.pdf')
+    processed = []
+    process = processor._process
+
+    def recording_process(file_path):
+        processed.append(file_path)
+        return process(file_path)
+
+    monkeypatch.setattr(processor, '_process', recording_process)
+    first = processor.process(path)
+    second = processor.process(path)
+
+    assert processed == [path]
+    assert _content(second) == _content(first)
+    assert second['filing_cabinet']['processed_at'] > first['filing_cabinet']['processed_at']
+    assert second['processing']['timestamp'] > first['processing']['timestamp']
+
+def test_hash_algorithm_change_misses_cache(processor):
+    """Test that a result cached under one hash algorithm isn't reused under another."""
+    path = os.path.join(FIXTURES, 'git_hub_receipt.pdf')
+    first = processor.process(path)
+    processor.config.set('file.hash.algorithm', 'md5')
+    second = processor.process(path)
+
+    assert len(second['filing_cabinet']['checksum']) == 32
+    assert second['filing_cabinet']['checksum'] != first['filing_cabinet']['checksum']
@@ -0,0 +1,71 @@
+"""Tests for FileService indexing."""
+import hashlib
+import os
+import pytest
+from filing_cabinet.models import file as file_module
+from filing_cabinet.services.file_service import FileService
+
+@pytest.fixture
+def file_service(temp_dir):
+    """FileService instance."""
+    service = FileService(os.path.join(temp_dir, 'test.db'))
+    yield service
+    service.close()
+
+@pytest.fixture
+def docs_dir(temp_dir):
+    """Directory of text files to index."""
+    path = os.path.join(temp_dir, 'docs')
+    os.mkdir(path)
+    for i in range(3):
+        with open(os.path.join(path, f'doc-{i}.txt'), 'w') as f:
+            f.write(f'document {i}')
+    return path
+
+@pytest.fixture
+def hashed_paths(monkeypatch):
+    """Paths hashed through File, in order."""
+    paths = []
+    calculate_checksum = file_module.calculate_checksum
+
+    def counting_checksum(file_path, algorithm='sha256'):
+        paths.append(file_path)
+        return calculate_checksum(file_path, algorithm)
+
+    monkeypatch.setattr(file_module, 'calculate_checksum', counting_checksum)
+    return paths
+
+def test_reindex_skips_unchanged_files(file_service, docs_dir, hashed_paths):
+    """Test that re-indexing doesn't hash files whose stat data is unchanged."""
+    file_service.index_files(docs_dir)
+    assert len(hashed_paths) == 3
+
+    hashed_paths.clear()
+    result = file_service.index_files(docs_dir)
+
+    assert result == {'processed': 3, 'skipped': 0}
+    assert hashed_paths == []
+
+def test_reindex_rehashes_modified_file(file_service, docs_dir, hashed_paths):
+    """Test that re-indexing hashes a file whose size and mtime changed."""
+    file_service.index_files(docs_dir)
+    modified = os.path.join(docs_dir, 'doc-1.txt')
+    with open(modified, 'w') as f:
+        f.write('document 1, revised')
+    stat = os.stat(modified)
+    os.utime(modified, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    hashed_paths.clear()
+    file_service.index_files(docs_dir)
+
+    assert hashed_paths == [modified]
+    checksum = hashlib.sha256(b'document 1, revised').hexdigest()
+    assert file_service.file_repo.get_by_checksum(checksum).path == modified
+
+def test_index_includes_every_file_type(file_service, docs_dir):
+    """Test that indexing isn't limited to the file.index.extensions setting."""
+    with open(os.path.join(docs_dir, 'scan.PNG'), 'wb') as f:
+        f.write(b'\x89PNG\r\n\x1a\n')
+
+    assert '.png' not in file_service.config.get('file.index.extensions')
+    assert file_service.index_files(docs_dir) == {'processed': 4, 'skipped': 0}
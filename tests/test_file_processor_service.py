@@ -0,0 +1,62 @@
+"""Tests for FileProcessorService."""
+import os
+import pytest
+from filing_cabinet.services import file_processor_service
+from filing_cabinet.services.file_processor_service import FileProcessorService, _ocr_cache_key
+
+@pytest.fixture
+def file_processor(temp_dir):
+    """FileProcessorService with its own database."""
+    service = FileProcessorService(os.path.join(temp_dir, 'test.db'))
+    yield service
+    service.ocr_cache.close()
+
+@pytest.fixture
+def ocr_calls(monkeypatch):
+    """Images OCR'd, in order, by a stub that 'reads' an image's bytes as its text."""
+    calls = []
+
+    def fake_ocr(image_path):
+        calls.append(image_path)
+        with open(image_path) as f:
+            return f'ocr {f.read()}'
+
+    monkeypatch.setattr(file_processor_service, '_ocr_image_file', fake_ocr)
+    # Threads rather than processes, so the stub is what runs
+    monkeypatch.setattr(file_processor_service, '_tesserocr', lambda: True)
+    return calls
+
+@pytest.fixture
+def rendered_pages(file_processor, temp_dir, monkeypatch):
+    """Five rendered pages in chunks of three, pages 3 and 5 repeating pages 1 and 2."""
+    paths = []
+    for number, content in enumerate(['A', 'B', 'A', 'C', 'B'], 1):
+        path = os.path.join(temp_dir, f'page-{number}.jpg')
+        with open(path, 'w') as f:
+            f.write(content)
+        paths.append(path)
+
+    def iter_pdf_pages(file_path, pages):
+        yield paths[:3]
+        yield paths[3:]
+
+    monkeypatch.setattr(file_processor, '_iter_pdf_pages', iter_pdf_pages)
+    return paths
+
+def test_ocr_pdf_uses_cache_and_dedups_pages(file_processor, rendered_pages, ocr_calls):
+    """Test that cached pages aren't OCR'd and repeated pages are OCR'd once per document."""
+    file_processor.ocr_cache.put(_ocr_cache_key(rendered_pages[3], b'pdf-page'), 'cached C')
+
+    texts = file_processor._ocr_pdf('scan.pdf', pages=[1, 2, 3, 4, 5])
+
+    assert texts == ['ocr A', 'ocr B', 'ocr A', 'cached C', 'ocr B']
+    assert ocr_calls == rendered_pages[:2]
+    assert file_processor.ocr_cache.get(_ocr_cache_key(rendered_pages[0], b'pdf-page')) == 'ocr A'
+
+def test_ocr_pdf_again_is_all_cache_hits(file_processor, rendered_pages, ocr_calls):
+    """Test that OCRing a document again reads every page from the cache."""
+    first = file_processor._ocr_pdf('scan.pdf', pages=[1, 2, 3, 4, 5])
+    ocr_calls.clear()
+
+    assert file_processor._ocr_pdf('scan.pdf', pages=[1, 2, 3, 4, 5]) == first
+    assert ocr_calls == []
@@ -0,0 +1,151 @@
+"""Tests for FileRepository."""
+import os
+import sqlite3
+import tempfile
+import pytest
+from filing_cabinet.models import File
+from filing_cabinet.repositories import BaseRepository, FileRepository
+from filing_cabinet.repositories.file_repository import SAVE_MANY_ROWS
+
+@pytest.fixture
+def temp_db():
+    """Temporary database path."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        yield os.path.join(temp_dir, 'test.db')
+
+@pytest.fixture
+def make_file(temp_db):
+    """Factory writing a file of the given size next to the database."""
+    def make(name, size):
+        path = os.path.join(os.path.dirname(temp_db), name)
+        with open(path, 'wb') as f:
+            f.write(name.encode().ljust(size, b'.'))
+        return File(path)
+    return make
+
+@pytest.fixture
+def file_repo(temp_db):
+    """FileRepository instance."""
+    repo = FileRepository(temp_db)
+    yield repo
+    repo.close()
+
+def test_repositories_must_define_tables():
+    """Test that a repository without create_table can't be built."""
+    class NoTables(BaseRepository):
+        pass
+
+    with pytest.raises(TypeError):
+        NoTables(':memory:')
+
+def test_in_memory_repositories_get_tables():
+    """Test that every in-memory repository has its own tables."""
+    for _ in range(2):
+        repo = FileRepository(':memory:')
+        assert repo.get_statistics() == {'total_files': 0, 'total_size': 0}
+        repo.close()
+
+def test_recreated_database_gets_tables(temp_db):
+    """Test that a database deleted and recreated at the same path gets its tables again."""
+    FileRepository(temp_db).close()
+    os.unlink(temp_db)
+
+    repo = FileRepository(temp_db)
+    assert repo.get_statistics() == {'total_files': 0, 'total_size': 0}
+    repo.close()
+
+def test_close_is_idempotent(file_repo):
+    """Test that closing a repository twice is harmless."""
+    file_repo.close()
+    file_repo.close()
+    assert file_repo.conn is None
+
+def test_statistics_follow_inserts(file_repo, make_file):
+    """Test that saved files are counted once each."""
+    file_repo.save(make_file('a.txt', 100))
+    file_repo.save_many([make_file('b.txt', 20), make_file('c.txt', 10)])
+    # Already recorded, so neither row nor totals change
+    file_repo.save(make_file('a.txt', 100))
+
+    assert file_repo.get_statistics() == {'total_files': 3, 'total_size': 130}
+
+def _record(i):
+    """A File for the i-th of many paths, without one on disk."""
+    return File.from_record({
+        'path': f'/docs/{i}.txt', 'name': f'{i}.txt', 'size': i + 1,
+        'checksum': f'checksum-{i}', 'mime_type': 'text/plain'
+    })
+
+@pytest.mark.parametrize('count', [SAVE_MANY_ROWS, SAVE_MANY_ROWS + 1, 2 * SAVE_MANY_ROWS + 1])
+def test_save_many_across_row_groups(file_repo, count):
+    """Test that save_many stores each file once however its multi-row INSERTs split them."""
+    # Repeats of the first and last files land in the last INSERT, next
+    # to the last file itself when it starts a group of its own
+    files = [_record(i) for i in range(count)] + [_record(0), _record(count - 1)]
+    file_repo.save_many(files)
+    # Saving everything again changes nothing
+    file_repo.save_many(files)
+
+    rows = file_repo.fetch_all("SELECT path, size FROM file ORDER BY id")
+    assert [(row['path'], row['size']) for row in rows] == [(f'/docs/{i}.txt', i + 1) for i in range(count)]
+    assert file_repo.get_statistics() == {
+        'total_files': count,
+        'total_size': count * (count + 1) // 2
+    }
+
+def test_statistics_follow_deletes(file_repo, make_file):
+    """Test that deleted files leave the totals."""
+    file_repo.save_many([make_file('a.txt', 100), make_file('b.txt', 20)])
+    file_id = file_repo.fetch_one("SELECT id FROM file WHERE name = 'a.txt'")['id']
+
+    file_repo.delete(file_id)
+
+    assert file_repo.get_statistics() == {'total_files': 1, 'total_size': 20}
+
+def test_statistics_follow_size_updates(file_repo, make_file):
+    """Test that a changed size moves the total size only."""
+    file_repo.save_many([make_file('a.txt', 100), make_file('b.txt', 20)])
+
+    file_repo.execute("UPDATE file SET size = 50 WHERE name = 'a.txt'")
+
+    assert file_repo.get_statistics() == {'total_files': 2, 'total_size': 70}
+
+def test_statistics_seeded_from_existing_files(temp_db):
+    """Test that a database from before the totals table starts from its files."""
+    conn = sqlite3.connect(temp_db)
+    conn.execute("""
+        CREATE TABLE file (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            checksum TEXT NOT NULL,
+            name TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            path TEXT NOT NULL,
+            mime_type TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE(checksum, path)
+        )
+    """)
+    conn.executemany(
+        "INSERT INTO file (checksum, name, size, path, mime_type) VALUES (?, ?, ?, ?, ?)",
+        [('c1', 'a.txt', 7, '/a.txt', 'text/plain'), ('c2', 'b.txt', 5, '/b.txt', 'text/plain')]
+    )
+    conn.commit()
+    conn.close()
+
+    repo = FileRepository(temp_db)
+    assert repo.get_statistics() == {'total_files': 2, 'total_size': 12}
+    repo.close()
+
+def test_stat_cache_lookup_by_paths(file_repo):
+    """Test that only the requested paths are loaded, across several lookup queries."""
+    entries = [(f'/docs/{i}.txt', (1, i, 1000 + i, i), f'checksum-{i}') for i in range(2000)]
+    file_repo.save_stat_cache('sha256', entries)
+    file_repo.save_stat_cache('md5', [('/docs/0.txt', (1, 0, 1000, 0), 'other')])
+
+    paths = [f'/docs/{i}.txt' for i in range(0, 2000, 2)] + ['/docs/missing.txt']
+    cached = file_repo.get_stat_cache('sha256', paths)
+
+    assert len(cached) == 1000
+    assert cached['/docs/0.txt'] == ((1, 0, 1000, 0), 'checksum-0')
+    assert cached['/docs/1998.txt'] == ((1, 1998, 2998, 1998), 'checksum-1998')
+    assert '/docs/1.txt' not in cached
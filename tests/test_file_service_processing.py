@@ -0,0 +1,84 @@
+"""Tests for FileService processing several files at once."""
+import asyncio
+import os
+import shutil
+import pytest
+from filing_cabinet.services import file_service as file_service_module
+from filing_cabinet.services.document_processor import DocumentProcessor
+from filing_cabinet.services.file_service import FileService
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+@pytest.fixture
+def file_service(temp_dir):
+    """FileService instance."""
+    service = FileService(os.path.join(temp_dir, 'test.db'))
+    yield service
+    service.close()
+
+@pytest.fixture
+def documents(temp_dir):
+    """The fixture PDFs, plus a few text files."""
+    docs_dir = os.path.join(temp_dir, 'docs')
+    os.mkdir(docs_dir)
+    paths = []
+    for name in sorted(name for name in os.listdir(FIXTURES) if name.endswith('.pdf')):
+        path = os.path.join(docs_dir, name)
+        shutil.copy(os.path.join(FIXTURES, name), path)
+        paths.append(path)
+    for i in range(3):
+        path = os.path.join(docs_dir, f'note-{i}.txt')
+        with open(path, 'w') as f:
+            f.write(f'note {i} from 2024-01-0{i + 1}')
+        paths.append(path)
+    return paths
+
+def test_process_many_concurrently(file_service, documents):
+    """Test that concurrent processing returns every result in order and stores it."""
+    results = asyncio.run(file_service.process_many(documents, max_concurrency=4))
+
+    assert len(results) == len(documents)
+    for path, result in zip(documents, results):
+        assert not result['content']['text'].startswith('Failed')
+        checksum = result['filing_cabinet']['checksum']
+        assert file_service.get_metadata(checksum) is not None
+    assert file_service.file_repo.get_statistics()['total_files'] == len(documents)
+
+def test_add_directory(file_service, documents):
+    """Test adding a directory processes and stores each file."""
+    result = file_service.add_file(os.path.dirname(documents[0]), workers=4)
+
+    assert result == {'processed': len(documents), 'skipped': 0}
+    assert file_service.file_repo.get_statistics()['total_files'] == len(documents)
+
+def test_add_directory_matches_single_file_processing(file_service, documents):
+    """Test that files added concurrently store what processing each alone gives."""
+    file_service.add_file(os.path.dirname(documents[0]), workers=4)
+
+    processor = DocumentProcessor(file_service.config)
+    for path in documents:
+        expected = processor.process(path)
+        stored = file_service.get_metadata(expected['filing_cabinet']['checksum'])
+        assert stored['content'] == expected['content']
+        assert stored['pdf_metadata'] == expected['pdf_metadata']
+
+def test_process_many_extracts_pdfs_in_worker_processes(file_service, documents, monkeypatch):
+    """Test that enough PDFs are extracted by worker processes, storing what threads would."""
+    monkeypatch.setattr(file_service_module, 'PROCESS_POOL_MIN_PDFS', 2)
+    pooled = []
+    process_many = DocumentProcessor.process_many
+
+    def recording_process_many(self, file_paths, workers=None):
+        pooled.extend(file_paths)
+        return process_many(self, file_paths, workers)
+
+    monkeypatch.setattr(DocumentProcessor, 'process_many', recording_process_many)
+    results = asyncio.run(file_service.process_many(documents, max_concurrency=2))
+
+    assert pooled == [path for path in documents if path.endswith('.pdf')]
+    processor = DocumentProcessor(file_service.config)
+    for path, result in zip(documents, results):
+        expected = processor.process(path)
+        assert result['content'] == expected['content']
+        assert result['pdf_metadata'] == expected['pdf_metadata']
+        assert file_service.get_metadata(expected['filing_cabinet']['checksum']) is not None
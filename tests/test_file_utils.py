@@ -0,0 +1,37 @@
+"""Tests for the file utilities."""
+import os
+import pytest
+from filing_cabinet.utils import walk_files
+
+@pytest.fixture
+def linked_tree(temp_dir):
+    """Directory tree with a symlink loop, a second link to a subdirectory and a dangling link."""
+    top = os.path.join(temp_dir, 'top')
+    sub = os.path.join(top, 'sub')
+    os.makedirs(sub)
+    for path in (os.path.join(top, 'a.txt'), os.path.join(sub, 'b.txt')):
+        with open(path, 'w') as f:
+            f.write('text')
+    os.symlink(top, os.path.join(sub, 'loop'))
+    os.symlink(sub, os.path.join(top, 'link'))
+    os.symlink(os.path.join(temp_dir, 'missing'), os.path.join(sub, 'dangling'))
+    return top
+
+def _walked(top, follow_symlinks):
+    """Paths walk_files yields, relative to top and sorted."""
+    return sorted(os.path.relpath(entry.path, top) for entry in walk_files(top, follow_symlinks))
+
+def test_walk_files_yields_symlinks_unfollowed(linked_tree):
+    """Test that without following, symlinks are yielded as entries and never descended into."""
+    assert _walked(linked_tree, False) == [
+        'a.txt', 'link', os.path.join('sub', 'b.txt'),
+        os.path.join('sub', 'dangling'), os.path.join('sub', 'loop')
+    ]
+
+def test_walk_files_follows_each_directory_once(linked_tree):
+    """Test that following symlinks ends despite the loop and visits each real directory once."""
+    walked = _walked(linked_tree, True)
+
+    assert [os.path.basename(path) for path in walked] == ['a.txt', 'b.txt', 'dangling']
+    # Found at the top, not again through the loop back to it
+    assert 'a.txt' in walked
@@ -0,0 +1,39 @@
+"""Tests for OcrCacheRepository."""
+import os
+import pytest
+from filing_cabinet.repositories import OcrCacheRepository
+
+@pytest.fixture
+def ocr_cache(temp_dir):
+    """OcrCacheRepository instance."""
+    repo = OcrCacheRepository(os.path.join(temp_dir, 'test.db'))
+    yield repo
+    repo.close()
+
+def test_get_missing_key(ocr_cache):
+    """Test that a key never put has no text."""
+    assert ocr_cache.get(b'missing') is None
+
+def test_put_then_get(ocr_cache):
+    """Test that put text is returned by key, including empty text."""
+    ocr_cache.put(b'page', 'page text')
+    ocr_cache.put(b'blank', '')
+
+    assert ocr_cache.get(b'page') == 'page text'
+    assert ocr_cache.get(b'blank') == ''
+
+def test_put_keeps_first_text(ocr_cache):
+    """Test that putting a key again leaves its first text."""
+    ocr_cache.put(b'page', 'first')
+    ocr_cache.put(b'page', 'second')
+
+    assert ocr_cache.get(b'page') == 'first'
+
+def test_cache_persists(ocr_cache, temp_dir):
+    """Test that cached text is found by a repository opened later on the same database."""
+    ocr_cache.put(b'page', 'page text')
+    ocr_cache.close()
+
+    reopened = OcrCacheRepository(os.path.join(temp_dir, 'test.db'))
+    assert reopened.get(b'page') == 'page text'
+    reopened.close()